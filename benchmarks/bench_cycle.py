@@ -0,0 +1,174 @@
+"""End-to-end collection benchmark against the local Orion simulator and a stand-in database.
+
+Drives EggCountScheduler.run_egg_counts_job and the POST /egg_counts handler, and reports cycle
+wall time, p50/p99 per-aviary latency and throughput.
+
+    python -m benchmarks.bench_cycle --cycles 3 --latency-ms 20 --db-latency-ms 15 --drop-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List
+from zoneinfo import ZoneInfo
+
+WORKING_AVIARIES = [15, 16, 17, 18, 19, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 38]
+BLOCKS = ["BLOCK_A1_A8", "BLOCK_A9_A12", "BLOCK_B2_B8", "BLOCK_B9_B11", "BLOCK_H1", "BLOCK_H3"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _configure_environment(port: int, state_dir: str, args):
+    # Must run before anything under src/ is imported: settings are read at import time
+    os.environ["AVIARY_PORT"] = str(port)
+    os.environ["AVIARY_FILA_MAPPING_DEFAULT"] = json.dumps({str(index): index + 1 for index in range(48)})
+    for block_index, block in enumerate(BLOCKS):
+        aviaries = WORKING_AVIARIES[block_index::len(BLOCKS)]
+        os.environ[block] = json.dumps([
+            {"id": aviary_id, "devcmd": f"#{aviary_id:02d}DEV", "name": f"Aviary {aviary_id}", "target_cmd": "#CNT\r"}
+            for aviary_id in aviaries
+        ])
+        # One loopback address per block, so per-controller limits apply as in production
+        os.environ[f"{block}_IP"] = f"127.0.0.{block_index + 1}"
+    os.environ["COUNT_SNAPSHOT_PATH"] = os.path.join(state_dir, "count_snapshots.sqlite3")
+    os.environ["WRITE_JOURNAL_PATH"] = os.path.join(state_dir, "write_journal.sqlite3")
+    os.environ["CHANGE_DETECTION"] = "true" if args.change_detection else "false"
+    os.environ["WRITE_JOURNAL_ENABLED"] = "false"
+    os.environ["SINGLE_FLIGHT_RESULT_TTL_SECONDS"] = "0"
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _summary(name: str, latencies: List[float], failures: int, wall_seconds: float) -> str:
+    total = len(latencies)
+    return (f"{name:<14} n={total:<4} failed={failures:<3} wall={wall_seconds:7.3f}s "
+            f"p50={_percentile(latencies, 50) * 1000:7.1f}ms p99={_percentile(latencies, 99) * 1000:7.1f}ms "
+            f"throughput={total / wall_seconds if wall_seconds else 0:7.1f}/s")
+
+
+async def _run(args):
+    from benchmarks.orion_simulator import OrionSimulator, SimulatedAviary
+    from src.domain.interfaces.database_repository import DatabaseRepository
+    from src.infrastructure.aviary_registry import aviary_registry
+    from src.infrastructure.orion.connection_pool import orion_pool
+    from src.infrastructure.use_case_factory import configure_database_repository
+    from src.presentation.api.v1.models.egg_count import EggCountRequest
+    from src.presentation.api.v1 import routes
+    from src.scheduler.egg_count_scheduler import EggCountScheduler
+    from fastapi import HTTPException, Response
+
+    class StandInDatabase(DatabaseRepository):
+        """Keeps the last counts in memory and sleeps to mimic a SQL Server round trip."""
+        rows: Dict[tuple, int] = {}
+        lock = threading.Lock()
+
+        def upsert_egg_counts(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict) -> bool:
+            time.sleep(args.db_latency_ms / 1000)
+            with self.lock:
+                for index, count in enumerate(counts):
+                    self.rows[(aviary_id, count_date, fila_mapping[index])] = count
+            return True
+
+    class InstrumentedScheduler(EggCountScheduler):
+        def __init__(self):
+            super().__init__()
+            self.latencies: List[float] = []
+            self.failures = 0
+
+        async def process_aviary(self, aviary_id: int, date: date) -> bool:
+            started = time.perf_counter()
+            ok = await super().process_aviary(aviary_id, date)
+            self.latencies.append(time.perf_counter() - started)
+            self.failures += 0 if ok else 1
+            return ok
+
+    configure_database_repository(StandInDatabase)
+    aviary_registry.load()
+    simulator = OrionSimulator(
+        {f"#{aviary_id:02d}DEV": SimulatedAviary(devcmd=f"#{aviary_id:02d}DEV") for aviary_id in WORKING_AVIARIES},
+        latency_seconds=args.latency_ms / 1000,
+        jitter_seconds=args.jitter_ms / 1000,
+        fragment_size=args.fragment_size,
+        drop_rate=args.drop_rate,
+        close_after_reply=args.close_after_reply,
+        seed=42,
+    )
+    await simulator.start("0.0.0.0", int(os.environ["AVIARY_PORT"]))
+    scheduler = InstrumentedScheduler()
+    try:
+        print(f"{len(WORKING_AVIARIES)} aviaries on {len(BLOCKS)} controllers, device latency {args.latency_ms}ms "
+              f"(+{args.jitter_ms}ms jitter), db latency {args.db_latency_ms}ms, drop rate {args.drop_rate}")
+        for cycle in range(1, args.cycles + 1):
+            scheduler.latencies, scheduler.failures = [], 0
+            started = time.perf_counter()
+            await scheduler.run_egg_counts_job(window_seconds=args.stagger_window_seconds)
+            print(_summary(f"cycle {cycle}", scheduler.latencies, scheduler.failures, time.perf_counter() - started))
+
+        if args.api_requests:
+            today = datetime.now(ZoneInfo("America/Asuncion")).strftime("%Y-%m-%d")
+            latencies: List[float] = []
+            failures = 0
+
+            async def call(aviary_id: int):
+                nonlocal failures
+                started = time.perf_counter()
+                try:
+                    await routes.process_egg_counts(EggCountRequest(aviary_id=aviary_id, date=today), None, Response())
+                except HTTPException:
+                    failures += 1
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*[
+                call(WORKING_AVIARIES[index % len(WORKING_AVIARIES)]) for index in range(args.api_requests)
+            ])
+            print(_summary("api", latencies, failures, time.perf_counter() - started))
+
+        stats = simulator.stats
+        print(f"simulator: {stats.connections} connections, {stats.handshakes} handshakes, "
+              f"{stats.count_requests} count requests, {stats.dropped} dropped; pool: {orion_pool.stats()}")
+    finally:
+        scheduler.executor.shutdown(wait=True)
+        orion_pool.close_all()
+        await simulator.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end collection benchmark")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--api-requests", type=int, default=44, help="concurrent POST /egg_counts calls (0 to skip)")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--fragment-size", type=int, default=0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--close-after-reply", action="store_true")
+    parser.add_argument("--db-latency-ms", type=float, default=15.0)
+    parser.add_argument("--stagger-window-seconds", type=float, default=0.0,
+                        help="spread aviary starts over this window, as SCHEDULER_MODE=staggered does")
+    parser.add_argument("--change-detection", action="store_true", help="keep change detection on between cycles")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as state_dir:
+        _configure_environment(_free_port(), state_dir, args)
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
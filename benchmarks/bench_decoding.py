@@ -0,0 +1,56 @@
+"""Microbenchmark: Orion count frame decoding.
+
+Compares the original string-slicing parser with the bytes-based decoder in
+src/infrastructure/orion/decoding.py, for single frames and for a batch.
+
+    python -m benchmarks.bench_decoding [--frames N] [--repeat R]
+"""
+import argparse
+import random
+import timeit
+from src.infrastructure.orion.decoding import decode_frame, decode_frames, xor_bytes
+
+NUM_ROWS = 48
+
+
+def build_frame(counts):
+    body = b"#01RDAT00000000" + "".join(f"{count:04X}" for count in counts).encode("ascii")
+    return body + f"*{xor_bytes(body):02X}\r".encode("ascii")
+
+
+def legacy_parse(count_response: bytes, num_rows: int):
+    # Parser the original blocking Orion client used before the decoding module existed
+    ascii_response = count_response.decode('ascii', errors='replace').strip()
+    payload = ascii_response[15:-3]
+    if len(payload) != num_rows * 4:
+        return None
+    return [int(payload[i:i+4], 16) for i in range(0, len(payload), 4)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=10000, help="frames in the batch")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    frames = [build_frame([rng.randrange(0, 0xFFFF) for _ in range(NUM_ROWS)]) for _ in range(args.frames)]
+    for frame in frames[:100]:
+        assert legacy_parse(frame, NUM_ROWS) == decode_frame(frame, NUM_ROWS).tolist()
+
+    cases = [
+        ("legacy str parse (no checksum)", lambda: [legacy_parse(frame, NUM_ROWS) for frame in frames]),
+        ("decode_frame, checksum", lambda: [decode_frame(frame, NUM_ROWS) for frame in frames]),
+        ("decode_frame, no checksum", lambda: [decode_frame(frame, NUM_ROWS, False) for frame in frames]),
+        ("decode_frames batch, checksum", lambda: decode_frames(frames, NUM_ROWS)),
+    ]
+    baseline = None
+    print(f"{len(frames)} frames x {NUM_ROWS} rows, best of {args.repeat}")
+    for name, run in cases:
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"  {name:<32} {best * 1000:8.1f} ms  {best / len(frames) * 1e6:6.2f} us/frame  x{baseline / best:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Local Orion controller simulator.
+
+Speaks the protocol used by AsyncOrionClient: it accepts the `devcmd` + timestamp +
+XOR checksum init command, replies with a 67-byte init response, and answers the count request
+with a frame of `num_rows` 4-digit hex counts. Latency, fragmentation and drops are configurable.
+
+    python -m benchmarks.orion_simulator --port 5843 --aviaries 22 --latency-ms 20 --fragment-size 64
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Dict, Optional
+from src.infrastructure.orion.decoding import xor_bytes
+
+INIT_RESPONSE = b"#INIT" + b"0" * 61 + b"\r"  # 67 bytes
+
+
+@dataclass
+class SimulatedAviary:
+    devcmd: str
+    num_rows: int = 48
+
+
+@dataclass
+class SimulatorStats:
+    connections: int = 0
+    handshakes: int = 0
+    count_requests: int = 0
+    dropped: int = 0
+
+
+class OrionSimulator:
+    def __init__(self, aviaries: Dict[str, SimulatedAviary], latency_seconds: float = 0.0,
+                 jitter_seconds: float = 0.0, fragment_size: int = 0, drop_rate: float = 0.0,
+                 close_after_reply: bool = False, seed: Optional[int] = None):
+        self.aviaries = aviaries
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.fragment_size = fragment_size
+        self.drop_rate = drop_rate
+        self.close_after_reply = close_after_reply
+        self.random = random.Random(seed)
+        self.stats = SimulatorStats()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host: str = "0.0.0.0", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Closing the transports ends the handlers' reads, so they finish instead of being cancelled
+        for writer in self._handlers.values():
+            writer.transport.abort()
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=1)
+
+    def count_frame(self, aviary: SimulatedAviary, timestamp: str) -> bytes:
+        seed = sum(map(ord, aviary.devcmd + timestamp))
+        payload = "".join(f"{(seed * (row + 1)) % 0x10000:04X}" for row in range(aviary.num_rows))
+        body = f"#{aviary.devcmd[:6]:<6}{timestamp[-8:]:>8}{payload}".encode("ascii")
+        return body + f"*{xor_bytes(body):02X}\r".encode("ascii")
+
+    def _match_init(self, command: bytes):
+        text = command.decode("ascii", errors="replace").rstrip("\r")
+        if not text.endswith("*"):
+            return None
+        body, checksum = text[:-3], text[-3:-1]
+        for devcmd, aviary in self.aviaries.items():
+            if body.startswith(devcmd) and f"{xor_bytes(body.encode('ascii')):02X}" == checksum:
+                return aviary, body[len(devcmd):]
+        return None
+
+    async def _send(self, writer: asyncio.StreamWriter, data: bytes):
+        delay = self.latency_seconds + self.random.uniform(0, self.jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        size = self.fragment_size or len(data)
+        for start in range(0, len(data), size):
+            writer.write(data[start:start + size])
+            await writer.drain()
+            if self.fragment_size:
+                await asyncio.sleep(0)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats.connections += 1
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        session = None
+        try:
+            while True:
+                command = await reader.readuntil(b"\r")
+                init = self._match_init(command)
+                if init is not None:
+                    session = init
+                    self.stats.handshakes += 1
+                    await self._send(writer, INIT_RESPONSE)
+                    continue
+                if session is None:
+                    break
+                self.stats.count_requests += 1
+                if self.random.random() < self.drop_rate:
+                    self.stats.dropped += 1
+                    continue
+                await self._send(writer, self.count_frame(*session))
+                if self.close_after_reply:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+
+def simulated_aviaries(count: int) -> Dict[str, SimulatedAviary]:
+    return {f"#{aviary_id:02d}DEV": SimulatedAviary(devcmd=f"#{aviary_id:02d}DEV") for aviary_id in range(1, count + 1)}
+
+
+async def _serve(args):
+    simulator = OrionSimulator(
+        simulated_aviaries(args.aviaries),
+        latency_seconds=args.latency_ms / 1000,
+        jitter_seconds=args.jitter_ms / 1000,
+        fragment_size=args.fragment_size,
+        drop_rate=args.drop_rate,
+        close_after_reply=args.close_after_reply,
+    )
+    port = await simulator.start(args.host, args.port)
+    print(f"Simulating {args.aviaries} aviaries on {args.host}:{port} (devcmd #01DEV .. #{args.aviaries:02d}DEV)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Orion controller simulator")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5843)
+    parser.add_argument("--aviaries", type=int, default=22)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--fragment-size", type=int, default=0, help="split replies into chunks of this many bytes")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of count requests left unanswered")
+    parser.add_argument("--close-after-reply", action="store_true", help="close the connection after each count reply")
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
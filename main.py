@@ -1,23 +1,61 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from src.presentation.api.v1.routes import router as api_router
 from src.scheduler.egg_count_scheduler import EggCountScheduler
 from contextlib import asynccontextmanager
 from src.config.logging import setup_logging
+from src.infrastructure.orion.connection_pool import orion_pool
+from src.infrastructure.database.connection import db_pool
+from src.infrastructure import metrics
+from src.application.services.leader_election import LeaderElection
+from src.config.settings import AVIARY_SOURCE_SETTINGS, COORDINATION_SETTINGS
+from src.infrastructure.aviary_config_watcher import AviaryConfigWatcher
+from src.infrastructure.aviary_registry import aviary_registry
+from src.infrastructure.use_case_factory import build_journal_flusher, build_leader_lock
 
 setup_logging()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    aviary_registry.load()
     scheduler = EggCountScheduler()
-    scheduler.start()
+    app.state.scheduler = scheduler
+    # With several workers or replicas, only the holder of the leader lock runs scheduled collection
+    leader_lock = build_leader_lock()
+    election = None
+    if leader_lock:
+        election = LeaderElection(leader_lock, on_elected=scheduler.start, on_demoted=scheduler.pause,
+                                  interval_seconds=COORDINATION_SETTINGS["check_interval_seconds"])
+        election.start()
+    else:
+        scheduler.start()
+    flusher = build_journal_flusher()
+    if flusher:
+        flusher.start()
+    watcher = None
+    if aviary_registry.config_path:
+        watcher = AviaryConfigWatcher(aviary_registry, AVIARY_SOURCE_SETTINGS["watch_interval_seconds"])
+        watcher.start()
     try:
         yield
     finally:
+        if election:
+            await election.stop()
+        if watcher:
+            await watcher.stop()
+        if flusher:
+            await flusher.stop()
         scheduler.shutdown()
+        orion_pool.close_all()
+        db_pool.close_all()
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(api_router, prefix="/api/v1")
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional, Tuple
+from zoneinfo import ZoneInfo
+from src.domain.entities.egg_count import EggCount
+
+MISSING = object()
+
+
+def _today() -> date:
+    return datetime.now(ZoneInfo('America/Argentina/Buenos_Aires')).date()
+
+
+class RecentCountsCache:
+    """Bounded in-memory copy of the stored counts of the last `retention_days` days, as EggCount entries.
+
+    Dates older than the window relative to the newest date seen are evicted, and at most
+    `max_entries` (aviary, date) entries are kept, least recently used first out. "Nothing stored"
+    answers are cached for `negative_ttl_seconds` only. Counts of today and yesterday can still be
+    rewritten, possibly by another worker or replica, so they are cached for `recent_ttl_seconds`.
+    """
+
+    def __init__(self, retention_days: int, max_entries: int, negative_ttl_seconds: float,
+                 recent_ttl_seconds: float, today: Callable[[], date] = _today):
+        self.retention_days = retention_days
+        self.max_entries = max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.recent_ttl_seconds = recent_ttl_seconds
+        self.today = today
+        self._entries: "OrderedDict[Tuple[int, date], Tuple[Optional[EggCount], float]]" = OrderedDict()
+        self._newest_date: Optional[date] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, aviary_id: int, count_date: date):
+        """Returns the cached EggCount (None for a cached "nothing stored"), or MISSING."""
+        key = (aviary_id, count_date)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, aviary_id: int, count_date: date, egg_count: Optional[EggCount]):
+        """Replaces the entry; dates outside the retention window are not cached."""
+        if not egg_count:
+            expires_at = time.monotonic() + self.negative_ttl_seconds
+        elif count_date >= self.today() - timedelta(days=1):
+            expires_at = time.monotonic() + self.recent_ttl_seconds
+        else:
+            expires_at = float("inf")
+        with self._lock:
+            if not self._in_window(count_date):
+                return
+            self._entries[(aviary_id, count_date)] = (egg_count, expires_at)
+            self._entries.move_to_end((aviary_id, count_date))
+            if self._newest_date is None or count_date > self._newest_date:
+                self._newest_date = count_date
+                self._evict_before(count_date - timedelta(days=self.retention_days - 1))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._newest_date = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _in_window(self, count_date: date) -> bool:
+        return self._newest_date is None or count_date > self._newest_date - timedelta(days=self.retention_days)
+
+    def _evict_before(self, oldest: date):
+        for key in [key for key in self._entries if key[1] < oldest]:
+            del self._entries[key]
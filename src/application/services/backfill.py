@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from src.application.services.count_writer import CountWriter, key_locks
+from src.domain.interfaces.backfill_checkpoint_repository import BackfillCheckpointRepository
+from src.domain.interfaces.database_repository import WriteRejected
+from src.domain.interfaces.orion_repository import OrionDeviceRepository
+from src.domain.interfaces.write_journal_repository import WriteJournalRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackfillTarget:
+    aviary_id: int
+    controller: str
+    orion_repo: OrionDeviceRepository
+    fila_mapping: dict
+
+
+@dataclass
+class BackfillReport:
+    fetched: int = 0
+    written: int = 0
+    queued: int = 0
+    skipped: int = 0
+    failed: List[Tuple[int, date]] = field(default_factory=list)
+
+
+class BackfillService:
+    """Re-collects a date range for a set of aviaries.
+
+    Each controller is walked by a single worker, aviary by aviary and date by date, so its requests
+    reuse one pooled connection and are spaced at least `min_interval_seconds` apart. Controllers run
+    concurrently. An aviary's fetched days are written together once it has been walked.
+    Finished (aviary, date) pairs are checkpointed, so re-running the same `run_id` resumes.
+    """
+
+    def __init__(self, checkpoint: BackfillCheckpointRepository, writer: CountWriter,
+                 journal: Optional[WriteJournalRepository], min_interval_seconds: float,
+                 executor: Optional[Executor] = None):
+        self.checkpoint = checkpoint
+        self.writer = writer
+        self.journal = journal
+        self.min_interval_seconds = min_interval_seconds
+        self.executor = executor
+
+    async def run(self, run_id: str, targets: List[BackfillTarget], start: date, end: date) -> BackfillReport:
+        if end < start:
+            raise ValueError("End date must not be before start date")
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        done = self.checkpoint.completed(run_id)
+        report = BackfillReport()
+
+        by_controller: Dict[str, List[BackfillTarget]] = {}
+        for target in targets:
+            by_controller.setdefault(target.controller, []).append(target)
+        logger.info(f"Backfill {run_id}: {len(targets)} aviaries on {len(by_controller)} controllers, "
+                    f"{start} to {end}, {len(done)} pairs already done")
+
+        await asyncio.gather(*[
+            self._walk_controller(run_id, controller_targets, dates, done, report)
+            for controller_targets in by_controller.values()
+        ])
+        logger.info(f"Backfill {run_id} finished: {report.fetched} fetched, {report.written} written, "
+                    f"{report.queued} queued, {report.skipped} already done, {len(report.failed)} failed")
+        return report
+
+    async def _walk_controller(self, run_id: str, targets: List[BackfillTarget], dates: List[date],
+                               done: Set[Tuple[int, date]], report: BackfillReport):
+        last_request = 0.0
+        for target in targets:
+            # Fetched days are held until the aviary is walked, then written together in as few batches as possible
+            fetched: Dict[date, Tuple[List[int], float]] = {}
+            for count_date in dates:
+                if (target.aviary_id, count_date) in done:
+                    report.skipped += 1
+                    continue
+                wait = last_request + self.min_interval_seconds - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_request = time.monotonic()
+
+                read_at = time.time()
+                counts = await target.orion_repo.fetch_egg_counts(target.aviary_id, count_date.strftime("%Y-%m-%d"))
+                if not counts:
+                    logger.error(f"Backfill {run_id}: no counts for aviary {target.aviary_id} on {count_date}")
+                    report.failed.append((target.aviary_id, count_date))
+                    continue
+                report.fetched += 1
+                fetched[count_date] = (counts, read_at)
+            if not fetched:
+                continue
+
+            outcomes = await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._write_or_journal, target, fetched
+            )
+            for count_date, outcome in sorted(outcomes.items()):
+                if outcome == "written":
+                    report.written += 1
+                elif outcome == "queued":
+                    report.queued += 1
+                if outcome == "failed":
+                    report.failed.append((target.aviary_id, count_date))
+                else:
+                    self.checkpoint.mark_done(run_id, target.aviary_id, count_date)
+
+    def _write_or_journal(self, target: BackfillTarget, fetched: Dict[date, Tuple[List[int], float]]) -> Dict[date, str]:
+        """Writes the days, journaling those that failed for the flusher; maps each to "written", "queued" or "failed"."""
+        with key_locks(target.aviary_id, fetched):
+            try:
+                outcomes = self.writer.write_days(
+                    target.aviary_id, {count_date: counts for count_date, (counts, _) in fetched.items()},
+                    target.fila_mapping
+                )
+            except Exception as e:
+                logger.error(f"Backfill write for aviary {target.aviary_id} error: {str(e)}")
+                outcomes = {count_date: False for count_date in fetched}
+
+            results = {}
+            for count_date, outcome in outcomes.items():
+                counts, read_at = fetched[count_date]
+                if isinstance(outcome, WriteRejected):
+                    # Journaling would only replay a write the database refuses
+                    logger.error(f"Backfill write for aviary {target.aviary_id} on {count_date} rejected: {str(outcome)}")
+                    results[count_date] = "failed"
+                elif outcome:
+                    if self.journal is not None:
+                        self.journal.supersede(target.aviary_id, count_date, read_at)
+                    results[count_date] = "written"
+                elif self.journal is None:
+                    results[count_date] = "failed"
+                else:
+                    # Keep the read: the journal flusher writes it once the database accepts it
+                    self.journal.append(target.aviary_id, count_date, counts, target.fila_mapping, read_at)
+                    results[count_date] = "queued"
+            return results
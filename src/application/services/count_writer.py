@@ -0,0 +1,87 @@
+import logging
+import threading
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.application.recent_counts_cache import RecentCountsCache
+from src.domain.entities.egg_count import EggCount
+from src.domain.entities.fila_mapping import shared_fila_mapping
+from src.domain.interfaces.database_repository import DatabaseRepository, WriteRejected
+from src.domain.interfaces.count_snapshot_repository import CountSnapshotRepository
+
+logger = logging.getLogger(__name__)
+
+_KEY_LOCKS = [threading.Lock() for _ in range(64)]
+
+def key_lock(aviary_id: int, count_date: date) -> threading.Lock:
+    """Serializes the journal bookkeeping and write of one aviary/date, so an older read never lands after a newer one."""
+    return _KEY_LOCKS[hash((aviary_id, count_date)) % len(_KEY_LOCKS)]
+
+@contextmanager
+def key_locks(aviary_id: int, dates: Iterable[date]):
+    """Holds `key_lock` for several dates, taking each stripe once and in a fixed order so two holders cannot deadlock."""
+    stripes = sorted({hash((aviary_id, count_date)) % len(_KEY_LOCKS) for count_date in dates})
+    with ExitStack() as stack:
+        for stripe in stripes:
+            stack.enter_context(_KEY_LOCKS[stripe])
+        yield
+
+class CountWriter:
+    def __init__(self, db_repo: DatabaseRepository, snapshots: Optional[CountSnapshotRepository] = None,
+                 recent_counts: Optional[RecentCountsCache] = None):
+        self.db_repo = db_repo
+        self.snapshots = snapshots
+        self.recent_counts = recent_counts
+
+    def write(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict) -> bool:
+        """Upserts the counts, sending only filas that changed since the last successful write."""
+        changed = self._changed(aviary_id, count_date, counts, fila_mapping)
+        if changed and not self.db_repo.upsert_egg_counts(aviary_id, count_date, *_subset(counts, fila_mapping, changed)):
+            return False
+        self._written(aviary_id, count_date, counts, fila_mapping, changed)
+        return True
+
+    def write_days(self, aviary_id: int, days: Dict[date, List[int]],
+                   fila_mapping: dict) -> Dict[date, Union[bool, WriteRejected]]:
+        """Like `write` for several days of one aviary, sent in as few round trips as the repository allows.
+
+        Each day maps to what `write` would have returned, or the WriteRejected it would have raised.
+        """
+        changed = {count_date: self._changed(aviary_id, count_date, counts, fila_mapping)
+                   for count_date, counts in days.items()}
+        pending = {count_date: _subset(days[count_date], fila_mapping, indexes)
+                   for count_date, indexes in changed.items() if indexes}
+        outcomes: Dict[date, Union[bool, WriteRejected]] = {count_date: True for count_date in days}
+        if pending:
+            outcomes.update(self.db_repo.upsert_egg_counts_for_days(aviary_id, pending))
+        for count_date, outcome in outcomes.items():
+            if outcome is True:
+                self._written(aviary_id, count_date, days[count_date], fila_mapping, changed[count_date])
+        return outcomes
+
+    def _changed(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict) -> List[int]:
+        if self.snapshots is None:
+            return list(range(len(counts)))
+        previous = self.snapshots.get_counts(aviary_id, count_date)
+        return [index for index, count in enumerate(counts) if previous.get(fila_mapping[index]) != count]
+
+    def _written(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict, changed: List[int]):
+        if self.snapshots is not None:
+            if changed:
+                self.snapshots.save_counts(
+                    aviary_id, count_date, {fila_mapping[index]: counts[index] for index in changed}
+                )
+            skipped = len(counts) - len(changed)
+            self.snapshots.record_writes(sent=len(changed), skipped=skipped)
+            logger.info(f"Aviary {aviary_id} on {count_date}: {len(changed)} filas written, {skipped} unchanged skipped")
+        if self.recent_counts is not None:
+            # Write-through: the query API serves what is now stored without reading it back
+            self.recent_counts.put(
+                aviary_id, count_date, EggCount(aviary_id, count_date, counts, shared_fila_mapping(fila_mapping))
+            )
+
+
+def _subset(counts: List[int], fila_mapping: dict, indexes: List[int]) -> Tuple[List[int], dict]:
+    if len(indexes) == len(counts):
+        return counts, fila_mapping
+    return [counts[index] for index in indexes], {position: fila_mapping[index] for position, index in enumerate(indexes)}
@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import Executor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from src.application.recent_counts_cache import MISSING, RecentCountsCache
+from src.domain.entities.egg_count import EggCount
+from src.domain.entities.fila_mapping import shared_fila_mapping
+from src.domain.interfaces.database_repository import DatabaseRepository
+
+
+class StoredCountsUnavailable(Exception):
+    """Raised when counts missing from the cache cannot be read from the database."""
+
+
+class EggCountQueryService:
+    """Read side of the stored counts: served from the recent-counts cache, misses read from the database."""
+
+    def __init__(self, cache: RecentCountsCache, db_repo: DatabaseRepository, executor: Optional[Executor] = None):
+        self.cache = cache
+        self.db_repo = db_repo
+        self.executor = executor
+
+    async def get_counts(self, aviary_ids: List[int], start: date, end: date) -> Dict[Tuple[int, date], Optional[EggCount]]:
+        """Returns (aviary, date) -> EggCount for every pair in the range, None where nothing is stored."""
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        found: Dict[Tuple[int, date], Optional[EggCount]] = {}
+        missing = []
+        for count_date in dates:
+            for aviary_id in aviary_ids:
+                cached = self.cache.get(aviary_id, count_date)
+                if cached is MISSING:
+                    missing.append((aviary_id, count_date))
+                else:
+                    found[(aviary_id, count_date)] = cached
+        if not missing:
+            return found
+
+        # One query covers every miss
+        stored = await asyncio.get_event_loop().run_in_executor(
+            self.executor, self.db_repo.fetch_stored_counts,
+            sorted({aviary_id for aviary_id, _ in missing}),
+            min(count_date for _, count_date in missing),
+            max(count_date for _, count_date in missing),
+        )
+        if stored is None:
+            raise StoredCountsUnavailable("Stored egg counts could not be read from the database")
+        for key in missing:
+            filas = stored.get(key)
+            egg_count = _egg_count(key[0], key[1], filas) if filas else None
+            self.cache.put(key[0], key[1], egg_count)
+            found[key] = egg_count
+        return found
+
+
+def _egg_count(aviary_id: int, count_date: date, filas: Dict[int, int]) -> EggCount:
+    ordered = sorted(filas)
+    return EggCount(aviary_id, count_date, [filas[fila] for fila in ordered],
+                    shared_fila_mapping(dict(enumerate(ordered))))
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Optional
+from src.application.services.count_writer import CountWriter, key_lock
+from src.domain.interfaces.database_repository import WriteRejected
+from src.domain.interfaces.write_journal_repository import WriteJournalRepository
+
+logger = logging.getLogger(__name__)
+
+class JournalFlusher:
+    """Background task that drains the write journal to the database in batches."""
+
+    def __init__(self, journal: WriteJournalRepository, writer: CountWriter, interval_seconds: float,
+                 batch_size: int, executor: Optional[Executor] = None):
+        self.journal = journal
+        self.writer = writer
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.executor = executor
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+        logger.info("Write journal flusher started")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Write journal flusher stopped")
+
+    async def flush_once(self) -> int:
+        """Writes one batch of due entries; returns how many reached the database."""
+        return await asyncio.get_event_loop().run_in_executor(self.executor, self._flush_batch)
+
+    def _flush_batch(self) -> int:
+        flushed = 0
+        for entry in self.journal.due(self.batch_size):
+            with key_lock(entry.aviary_id, entry.date):
+                # A newer read may have been written (and this entry dropped) since due() returned it
+                if not self.journal.is_pending(entry.id):
+                    continue
+                reason = ""
+                try:
+                    written = self.writer.write(entry.aviary_id, entry.date, entry.counts, entry.fila_mapping)
+                except WriteRejected as e:
+                    self.journal.fail(entry.id, str(e))
+                    logger.error(f"Journal entry {entry.id} for aviary {entry.aviary_id} on {entry.date} "
+                                 f"rejected by the database; moved to failed writes: {str(e)}")
+                    continue
+                except Exception as e:
+                    logger.error(f"Journal entry {entry.id} for aviary {entry.aviary_id} error: {str(e)}")
+                    written = False
+                    reason = str(e)
+                if written:
+                    self.journal.supersede(entry.aviary_id, entry.date, entry.created_at)
+                    flushed += 1
+                elif self.journal.reschedule(entry.id, reason):
+                    logger.warning(f"Journal entry {entry.id} for aviary {entry.aviary_id} on {entry.date} "
+                                   f"not written (attempt {entry.attempts + 1}); will retry")
+                else:
+                    logger.error(f"Journal entry {entry.id} for aviary {entry.aviary_id} on {entry.date} "
+                                 f"not written after {entry.attempts + 1} attempts; moved to failed writes")
+        if flushed:
+            logger.info(f"Flushed {flushed} journaled egg count writes to the database")
+        return flushed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                while await self.flush_once() >= self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Write journal flush failed: {str(e)}")
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Callable, Optional
+from src.domain.interfaces.leader_lock import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+class LeaderElection:
+    """Background task that competes for the leader lock and follows whether this process holds it.
+
+    A follower retries every `interval_seconds`, so it takes over within about one interval
+    after the leader's lock is released. The leader re-checks its lock on the same interval
+    and steps down as soon as it is lost.
+    """
+
+    def __init__(self, lock: LeaderLock, on_elected: Callable[[], None], on_demoted: Callable[[], None],
+                 interval_seconds: float, executor: Optional[Executor] = None):
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.interval_seconds = interval_seconds
+        self.executor = executor
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+        logger.info("Leader election started")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.is_leader:
+            self._set_leader(False)
+        await asyncio.get_event_loop().run_in_executor(self.executor, self.lock.release)
+        logger.info("Leader election stopped")
+
+    async def check_once(self) -> bool:
+        """Re-checks a held lock or tries to take a free one; returns whether this process leads."""
+        loop = asyncio.get_event_loop()
+        if self.is_leader and not await loop.run_in_executor(self.executor, self.lock.is_held):
+            logger.error("Leader lock lost; stopping scheduled collection")
+            self._set_leader(False)
+        if not self.is_leader and await loop.run_in_executor(self.executor, self.lock.try_acquire):
+            logger.info("Leader lock acquired; this process runs scheduled collection")
+            self._set_leader(True)
+        return self.is_leader
+
+    def _set_leader(self, is_leader: bool):
+        self.is_leader = is_leader
+        (self.on_elected if is_leader else self.on_demoted)()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leader election check failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight execution.
+
+    Successful results (non-empty, or as judged by `cacheable`) are also kept for `result_ttl_seconds`,
+    so near-simultaneous repeats are answered without running the work again. Failures are never cached.
+    """
+
+    def __init__(self, result_ttl_seconds: float):
+        self.result_ttl_seconds = result_ttl_seconds
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._results: Dict[Hashable, Tuple[object, float]] = {}
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable], cacheable: Callable[[object], bool] = bool):
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[1] >= time.monotonic():
+                self.cache_hits += 1
+                return cached[0]
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done, cacheable))
+        else:
+            self.coalesced += 1
+        # Shielded so a cancelled caller does not abort the work the other callers are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"coalesced": self.coalesced, "cache_hits": self.cache_hits, "cached": len(self._results)}
+
+    def _finish(self, key: Hashable, task: asyncio.Task, cacheable: Callable[[object], bool]):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None or not cacheable(task.result()):
+            return
+        if self.result_ttl_seconds > 0:
+            self._results[key] = (task.result(), time.monotonic() + self.result_ttl_seconds)
+        expired = [k for k, (_, expires_at) in self._results.items() if expires_at < time.monotonic()]
+        for k in expired:
+            del self._results[k]
@@ -1,21 +1,78 @@
+import asyncio
+import time
+from concurrent.futures import Executor
 from datetime import date
-from typing import Optional
+from typing import Mapping, Optional, Sequence
+from src.application.recent_counts_cache import RecentCountsCache
+from src.application.services.count_writer import CountWriter, key_lock
+from src.application.single_flight import SingleFlight
 from src.domain.entities.egg_count import EggCount
 from src.domain.interfaces.orion_repository import OrionDeviceRepository
-from src.domain.interfaces.database_repository import DatabaseRepository
+from src.domain.interfaces.database_repository import DatabaseRepository, WriteRejected
+from src.domain.interfaces.count_snapshot_repository import CountSnapshotRepository
+from src.domain.interfaces.write_journal_repository import WriteJournalRepository
 
 class ProcessEggCountsUseCase:
-    def __init__(self, orion_repo: OrionDeviceRepository, db_repo: DatabaseRepository, fila_mapping: dict):
+    def __init__(self, orion_repo: OrionDeviceRepository, db_repo: DatabaseRepository, fila_mapping: Mapping[int, int],
+                 flights: Optional[SingleFlight] = None, snapshots: Optional[CountSnapshotRepository] = None,
+                 journal: Optional[WriteJournalRepository] = None, recent_counts: Optional[RecentCountsCache] = None):
         self.orion_repo = orion_repo
         self.db_repo = db_repo
         self.fila_mapping = fila_mapping
+        self.flights = flights
+        self.writer = CountWriter(db_repo, snapshots, recent_counts)
+        self.journal = journal
 
-    def execute(self, aviary_id: int, count_date: date) -> Optional[EggCount]:
+    async def execute_async(self, aviary_id: int, count_date: date, executor: Optional[Executor] = None) -> Optional[EggCount]:
+        """Awaits an async Orion client and runs the blocking database upsert on `executor`.
+
+        With `flights` set, concurrent calls for the same aviary/date share one device read and one write.
+        """
+        if self.flights is None:
+            return await self._execute_async(aviary_id, count_date, executor)
+        # A read whose write is still queued is not cached: a retry after the TTL should try the write again
+        return await self.flights.run(
+            (aviary_id, count_date), lambda: self._execute_async(aviary_id, count_date, executor),
+            cacheable=lambda result: bool(result) and result.persisted
+        )
+
+    async def _execute_async(self, aviary_id: int, count_date: date, executor: Optional[Executor]) -> Optional[EggCount]:
         date_str = count_date.strftime("%Y-%m-%d")
-        counts = self.orion_repo.fetch_egg_counts(aviary_id, date_str)
+        counts = await self.orion_repo.fetch_egg_counts(aviary_id, date_str)
         if not counts:
             return None
-        success = self.db_repo.upsert_egg_counts(aviary_id, count_date, counts, self.fila_mapping)
-        if not success:
+        persisted = await asyncio.get_event_loop().run_in_executor(
+            executor, self.persist_counts, aviary_id, count_date, counts
+        )
+        if not persisted and self.journal is None:
             return None
-        return EggCount(aviary_id=aviary_id, date=count_date, counts=counts, fila_mapping=self.fila_mapping)
+        return EggCount(aviary_id=aviary_id, date=count_date, counts=counts, fila_mapping=self.fila_mapping,
+                        persisted=persisted)
+
+    def persist_counts(self, aviary_id: int, count_date: date, counts: Sequence[int]) -> bool:
+        """Journals the counts (when a journal is set) and writes them; returns whether they reached the database.
+
+        A journaled read that could not be written stays queued for the background flusher, so the
+        device does not have to be polled again.
+        """
+        read_at = time.time()
+        with key_lock(aviary_id, count_date):
+            entry_id = self.journal.append(aviary_id, count_date, counts, self.fila_mapping, read_at) if self.journal else None
+            try:
+                written = self.writer.write(aviary_id, count_date, counts, self.fila_mapping)
+            except WriteRejected as e:
+                # Replaying the same counts cannot succeed
+                if entry_id is not None:
+                    self.journal.fail(entry_id, str(e))
+                raise
+            except Exception:
+                if entry_id is not None:
+                    self.journal.reschedule(entry_id)
+                raise
+            if entry_id is not None:
+                if written:
+                    # Older queued reads of this aviary/date must not be replayed over these counts
+                    self.journal.supersede(aviary_id, count_date, read_at)
+                else:
+                    self.journal.reschedule(entry_id)
+        return written
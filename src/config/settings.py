@@ -1,12 +1,19 @@
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+import logging
 import os
 from dotenv import load_dotenv
 import json
 
+logger = logging.getLogger(__name__)
+
 # Load .env file
 load_dotenv()
 
+# Directory for the local state files (snapshots, write journal, backfill checkpoints, leader lock).
+# Keep it outside the source tree and on a persistent volume; each *_PATH variable can still override one file.
+STATE_DIR = os.getenv("STATE_DIR", "./data")
+
 # Database Settings
 DATABASE_SETTINGS = {
     "server": os.getenv("DATABASE_SERVER", "172.16.1.202"),
@@ -14,8 +21,124 @@ DATABASE_SETTINGS = {
     "user": os.getenv("DATABASE_USER", "your_username"),
     "password": os.getenv("DATABASE_PASSWORD", "your_password"),
     "driver": os.getenv("DATABASE_DRIVER", "ODBC Driver 17 for SQL Server"),
+    # Table or view the query API reads stored counts from. Its schema is not known to this repo, so
+    # there is no default: the GET endpoints stay disabled until a verified one is configured
+    "egg_counts_table": os.getenv("DATABASE_EGG_COUNTS_TABLE", ""),
+}
+
+DATABASE_POOL_SETTINGS = {
+    "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", 8)),
+    "max_idle_seconds": float(os.getenv("DATABASE_POOL_MAX_IDLE_SECONDS", 300)),
+    "checkout_timeout": float(os.getenv("DATABASE_POOL_CHECKOUT_TIMEOUT", 30)),
+}
+
+LOTE_CACHE_SETTINGS = {
+    "negative_ttl_seconds": float(os.getenv("LOTE_CACHE_NEGATIVE_TTL_SECONDS", 600)),
+    "retention_days": int(os.getenv("LOTE_CACHE_RETENTION_DAYS", 3)),
+}
+
+# Scheduler Settings
+SCHEDULER_SETTINGS = {
+    "max_workers": int(os.getenv("SCHEDULER_MAX_WORKERS", 8)),
+    "per_controller_limit": int(os.getenv("SCHEDULER_PER_CONTROLLER_LIMIT", 2)),
+    "job_deadline_seconds": float(os.getenv("SCHEDULER_JOB_DEADLINE_SECONDS", 55)),
+    "max_finished_jobs": int(os.getenv("SCHEDULER_MAX_FINISHED_JOBS", 500)),
+    "retry_backoff_base_seconds": float(os.getenv("SCHEDULER_RETRY_BACKOFF_BASE_SECONDS", 2)),
+    "retry_backoff_max_seconds": float(os.getenv("SCHEDULER_RETRY_BACKOFF_MAX_SECONDS", 15)),
+    # The lote prefetch is only an optimisation; it may use at most this much (and a tenth) of the job deadline
+    "lote_prefetch_timeout_seconds": float(os.getenv("SCHEDULER_LOTE_PREFETCH_TIMEOUT_SECONDS", 3)),
+    # "burst" starts every aviary at HH:59:00; "staggered" spreads them over the window before it
+    "mode": os.getenv("SCHEDULER_MODE", "burst"),
+    "stagger_window_seconds": float(os.getenv("SCHEDULER_STAGGER_WINDOW_SECONDS", 600)),
+    "day_end_run_lead_seconds": float(os.getenv("SCHEDULER_DAY_END_RUN_LEAD_SECONDS", 60)),
+}
+
+# Only one process runs scheduled collection: "none" (every process), "file" (flock) or "sql" (sp_getapplock)
+COORDINATION_SETTINGS = {
+    "mode": os.getenv("SCHEDULER_COORDINATION", "none"),
+    "lock_path": os.getenv("SCHEDULER_LOCK_PATH", os.path.join(STATE_DIR, "scheduler.lock")),
+    "lock_resource": os.getenv("SCHEDULER_LOCK_RESOURCE", "egg_counts_scheduler"),
+    "check_interval_seconds": float(os.getenv("SCHEDULER_LOCK_CHECK_INTERVAL_SECONDS", 15)),
+}
+
+# API Settings
+API_SETTINGS = {
+    "batch_concurrency": int(os.getenv("API_BATCH_CONCURRENCY", 8)),
+}
+
+# Read-only query API and its cache of recently stored counts
+QUERY_SETTINGS = {
+    "cache_retention_days": int(os.getenv("QUERY_CACHE_RETENTION_DAYS", 7)),
+    "cache_max_entries": int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 1000)),
+    "cache_negative_ttl_seconds": float(os.getenv("QUERY_CACHE_NEGATIVE_TTL_SECONDS", 60)),
+    "cache_recent_ttl_seconds": float(os.getenv("QUERY_CACHE_RECENT_TTL_SECONDS", 60)),
+    "max_range_days": int(os.getenv("QUERY_MAX_RANGE_DAYS", 31)),
+}
+
+# Coalescing of identical aviary/date requests
+SINGLE_FLIGHT_SETTINGS = {
+    "result_ttl_seconds": float(os.getenv("SINGLE_FLIGHT_RESULT_TTL_SECONDS", 30)),
+}
+
+# Local state (snapshots of the counts already written to SQL Server)
+STATE_SETTINGS = {
+    "count_snapshot_path": os.getenv("COUNT_SNAPSHOT_PATH", os.path.join(STATE_DIR, "count_snapshots.sqlite3")),
+    "count_snapshot_retention_days": int(os.getenv("COUNT_SNAPSHOT_RETENTION_DAYS", 3)),
+    "change_detection": os.getenv("CHANGE_DETECTION", "true").lower() in ("1", "true", "yes"),
+    "write_journal_path": os.getenv("WRITE_JOURNAL_PATH", os.path.join(STATE_DIR, "write_journal.sqlite3")),
+    "write_journal_enabled": os.getenv("WRITE_JOURNAL_ENABLED", "true").lower() in ("1", "true", "yes"),
+    # Async (mode=async) egg count jobs, shared by the workers using this state directory
+    "job_store_path": os.getenv("JOB_STORE_PATH", os.path.join(STATE_DIR, "egg_count_jobs.sqlite3")),
+}
+
+# Historical backfill
+BACKFILL_SETTINGS = {
+    "checkpoint_path": os.getenv("BACKFILL_CHECKPOINT_PATH", os.path.join(STATE_DIR, "backfill_checkpoints.sqlite3")),
+    "min_interval_seconds": float(os.getenv("BACKFILL_MIN_INTERVAL_SECONDS", 0.5)),
+}
+
+# Background flusher draining the write journal to SQL Server
+JOURNAL_FLUSHER_SETTINGS = {
+    "interval_seconds": float(os.getenv("JOURNAL_FLUSH_INTERVAL_SECONDS", 30)),
+    "batch_size": int(os.getenv("JOURNAL_FLUSH_BATCH_SIZE", 50)),
+    "backoff_base_seconds": float(os.getenv("JOURNAL_BACKOFF_BASE_SECONDS", 15)),
+    "backoff_max_seconds": float(os.getenv("JOURNAL_BACKOFF_MAX_SECONDS", 900)),
+    # Entries still unwritten after this many attempts move to the failed_writes table
+    "max_attempts": int(os.getenv("JOURNAL_MAX_ATTEMPTS", 20)),
+    # Entries handed to a flusher are hidden from the others for this long; covers a worker dying mid-flush
+    "claim_seconds": float(os.getenv("JOURNAL_CLAIM_SECONDS", 300)),
+}
+
+# Orion Protocol Settings
+ORION_SETTINGS = {
+    # Off until the checksum coverage is confirmed against captured controller replies
+    "verify_checksum": os.getenv("ORION_VERIFY_CHECKSUM", "false").lower() in ("1", "true", "yes"),
+    "pool_max_idle_per_controller": int(os.getenv("ORION_POOL_MAX_IDLE_PER_CONTROLLER", 2)),
+    "pool_max_idle_seconds": float(os.getenv("ORION_POOL_MAX_IDLE_SECONDS", 900)),
+    # Skip the init handshake on a pooled connection already set up for the same device and date.
+    # Off until confirmed that a real controller keeps that state per connection
+    "reuse_init_session": os.getenv("ORION_REUSE_INIT_SESSION", "false").lower() in ("1", "true", "yes"),
+    # Adaptive timeouts: a multiple of the observed round-trip percentile, never above the protocol defaults
+    "adaptive_timeouts": os.getenv("ORION_ADAPTIVE_TIMEOUTS", "true").lower() in ("1", "true", "yes"),
+    "latency_window": int(os.getenv("ORION_LATENCY_WINDOW", 200)),
+    "latency_min_samples": int(os.getenv("ORION_LATENCY_MIN_SAMPLES", 20)),
+    "timeout_percentile": float(os.getenv("ORION_TIMEOUT_PERCENTILE", 99)),
+    "timeout_multiplier": float(os.getenv("ORION_TIMEOUT_MULTIPLIER", 3)),
+    "timeout_floor_seconds": float(os.getenv("ORION_TIMEOUT_FLOOR_SECONDS", 0.25)),
+    # Circuit breaker per controller IP
+    "breaker_failure_threshold": int(os.getenv("ORION_BREAKER_FAILURE_THRESHOLD", 3)),
+    "breaker_cooldown_seconds": float(os.getenv("ORION_BREAKER_COOLDOWN_SECONDS", 20)),
 }
 
+# Aviary configuration source; a config file is re-read when it changes or on POST /api/v1/admin/aviaries/reload
+AVIARY_SOURCE_SETTINGS = {
+    "config_path": os.getenv("AVIARY_CONFIG_PATH", ""),
+    "watch_interval_seconds": float(os.getenv("AVIARY_CONFIG_WATCH_INTERVAL_SECONDS", 10)),
+    "admin_token": os.getenv("ADMIN_TOKEN", ""),
+}
+
+DEFAULT_WORKING_AVIARIES = "15,16,17,18,19,21,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,38"
+
 class AviaryConfig(BaseModel):
     ip: str
     port: int
@@ -25,16 +148,62 @@ class AviaryConfig(BaseModel):
     fila_mapping: Dict[int, int]
     target_cmd: str
     response_size: int
+    block: str = ""
+
+def _aviary_config(config: dict, block_name: str, block_ip: str, port: int) -> AviaryConfig:
+    return AviaryConfig(
+        ip=block_ip,
+        port=port,
+        devcmd=config["devcmd"],
+        name=config["name"],
+        num_rows=config.get("num_rows", int(os.getenv("AVIARY_NUM_ROWS_DEFAULT", 48))),
+        fila_mapping=config.get("fila_mapping", json.loads(os.getenv("AVIARY_FILA_MAPPING_DEFAULT", "{}"))),
+        target_cmd=config["target_cmd"],
+        response_size=config.get("response_size", int(os.getenv("AVIARY_RESPONSE_SIZE_DEFAULT", 210))),
+        block=block_name,
+    )
+
+def _read_aviary_file(config_path: str) -> dict:
+    # Unlike the environment, a broken file is an error: a reload must not silently drop aviaries
+    try:
+        with open(config_path, encoding="utf-8") as f:
+            source = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read aviary config file {config_path}: {e}")
+    if not isinstance(source, dict) or not isinstance(source.get("blocks"), dict):
+        raise ValueError(f"Aviary config file {config_path} must have a \"blocks\" object")
+    return source
 
-def load_aviary_configs() -> Dict[int, AviaryConfig]:
+def load_aviary_source(config_path: Optional[str] = None) -> Tuple[Dict[int, AviaryConfig], List[int]]:
+    """Parses the aviary configs and the working aviaries together; see AviaryRegistry.load.
+
+    With `config_path`, both come from a single read of that JSON file, so a reload never mixes two
+    versions of it; otherwise from the BLOCK_* and WORKING_AVIARIES environment variables.
+    """
+    source = _read_aviary_file(config_path) if config_path else None
+    return _configs_from_source(source, config_path), _working_from_source(source)
+
+def load_aviary_configs(config_path: Optional[str] = None) -> Dict[int, AviaryConfig]:
+    """Parses the block and aviary configs, from the JSON file at `config_path` or the BLOCK_* variables."""
+    return _configs_from_source(_read_aviary_file(config_path) if config_path else None, config_path)
+
+def load_working_aviaries(config_path: Optional[str] = None) -> List[int]:
+    """Aviaries the scheduler collects: the file's "working_aviaries" if present, else WORKING_AVIARIES."""
+    return _working_from_source(_read_aviary_file(config_path) if config_path else None)
+
+def _configs_from_source(source: Optional[dict], config_path: Optional[str]) -> Dict[int, AviaryConfig]:
     configs = {}
-    
-    # Shared aviary settings
     default_port = int(os.getenv("AVIARY_PORT", 5843))
-    default_num_rows = int(os.getenv("AVIARY_NUM_ROWS_DEFAULT", 48))
-    default_response_size = int(os.getenv("AVIARY_RESPONSE_SIZE_DEFAULT", 210))
-    default_fila_mapping = json.loads(os.getenv("AVIARY_FILA_MAPPING_DEFAULT", "{}"))
-    
+
+    if source is not None:
+        for block_name, block in source["blocks"].items():
+            try:
+                for config in block["aviaries"]:
+                    configs[config["id"]] = _aviary_config(config, block_name, block["ip"], block.get("port", default_port))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Invalid config for {block_name} in {config_path}: {e}")
+        return configs
+
     # Load blocks
     blocks = [
         ("BLOCK_A1_A8", os.getenv("BLOCK_A1_A8"), os.getenv("BLOCK_A1_A8_IP")),
@@ -47,26 +216,22 @@ def load_aviary_configs() -> Dict[int, AviaryConfig]:
     
     for block_name, block_json, block_ip in blocks:
         if not block_json or not block_ip:
-            print(f"Warning: Missing config for {block_name}")
+            logger.warning(f"Missing config for {block_name}")
             continue
         try:
             block_configs = json.loads(block_json)
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON for {block_name}: {e}")
+            logger.error(f"Error parsing JSON for {block_name}: {e}")
             continue
         for config in block_configs:
-            aviary_id = config["id"]
-            configs[aviary_id] = AviaryConfig(
-                ip=block_ip,
-                port=default_port,
-                devcmd=config["devcmd"],
-                name=config["name"],
-                num_rows=config.get("num_rows", default_num_rows),
-                fila_mapping=config.get("fila_mapping", default_fila_mapping),
-                target_cmd=config["target_cmd"],
-                response_size=config.get("response_size", default_response_size),
-            )
+            configs[config["id"]] = _aviary_config(config, block_name, block_ip, default_port)
     
     return configs
 
-AVIARY_CONFIGS = load_aviary_configs()
+def _working_from_source(source: Optional[dict]) -> List[int]:
+    if source is not None and source.get("working_aviaries") is not None:
+        try:
+            return [int(aviary_id) for aviary_id in source["working_aviaries"]]
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid \"working_aviaries\" in aviary config file: {e}")
+    return [int(aviary_id) for aviary_id in os.getenv("WORKING_AVIARIES", DEFAULT_WORKING_AVIARIES).split(",") if aviary_id.strip()]
@@ -1,10 +1,48 @@
-from dataclasses import dataclass
+from array import array
 from datetime import date
-from typing import List
+from typing import Dict, Iterable, Mapping
+
+def compact_counts(counts: Iterable[int]) -> array:
+    """Stores counts as unsigned 16-bit words (the width of an Orion count), widening only if needed."""
+    if isinstance(counts, array) and counts.typecode in ("H", "L"):
+        return counts
+    try:
+        return array("H", counts)
+    except OverflowError:
+        return array("L", counts)
 
-@dataclass
 class EggCount:
-    aviary_id: int
-    date: date
-    counts: List[int]
-    fila_mapping: dict
+    """The counts of one aviary for one day.
+
+    Counts are kept in a compact array and `fila_mapping` (count index -> fila) is shared by every
+    instance of the same aviary config, so holding many days of many aviaries stays cheap.
+    """
+
+    __slots__ = ("aviary_id", "date", "counts", "fila_mapping", "persisted")
+
+    def __init__(self, aviary_id: int, date: date, counts: Iterable[int], fila_mapping: Mapping[int, int],
+                 persisted: bool = True):
+        self.aviary_id = aviary_id
+        self.date = date
+        self.counts = compact_counts(counts)
+        self.fila_mapping = fila_mapping
+        self.persisted = persisted  # False while the write is still queued in the local journal
+
+    def filas(self) -> Dict[int, int]:
+        """Counts keyed by fila number."""
+        fila_mapping = self.fila_mapping
+        return {fila_mapping[index]: count for index, count in enumerate(self.counts)}
+
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EggCount):
+            return NotImplemented
+        return (self.aviary_id, self.date, self.counts, dict(self.fila_mapping), self.persisted) == (
+            other.aviary_id, other.date, other.counts, dict(other.fila_mapping), other.persisted
+        )
+
+    def __repr__(self) -> str:
+        return (f"EggCount(aviary_id={self.aviary_id!r}, date={self.date!r}, counts={self.counts.tolist()!r}, "
+                f"persisted={self.persisted!r})")
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+from src.domain.entities.egg_count import EggCount
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class EggCountJob:
+    id: str
+    aviary_id: int
+    count_date: date
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[EggCount] = None
+    error: Optional[str] = None
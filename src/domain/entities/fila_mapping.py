@@ -0,0 +1,20 @@
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+_shared: Dict[Tuple[Tuple[int, int], ...], Mapping[int, int]] = {}
+_lock = threading.Lock()
+
+def shared_fila_mapping(mapping: Mapping[int, int]) -> Mapping[int, int]:
+    """Returns one read-only instance per distinct count index -> fila mapping.
+
+    Most aviaries use the same default mapping, so their counts all point at a single object.
+    """
+    if isinstance(mapping, MappingProxyType):
+        return mapping
+    key = tuple(sorted((int(index), int(fila)) for index, fila in mapping.items()))
+    with _lock:
+        shared = _shared.get(key)
+        if shared is None:
+            shared = _shared[key] = MappingProxyType(dict(key))
+        return shared
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List
+
+@dataclass
+class PendingWrite:
+    id: int
+    aviary_id: int
+    date: date
+    counts: List[int]
+    fila_mapping: dict
+    attempts: int
+    created_at: float  # When the counts were read from the device
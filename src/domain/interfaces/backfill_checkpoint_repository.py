@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Set, Tuple
+
+class BackfillCheckpointRepository(ABC):
+    @abstractmethod
+    def completed(self, run_id: str) -> Set[Tuple[int, date]]:
+        pass
+
+    @abstractmethod
+    def mark_done(self, run_id: str, aviary_id: int, count_date: date) -> None:
+        pass
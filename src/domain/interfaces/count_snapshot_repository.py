@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict
+
+class CountSnapshotRepository(ABC):
+    @abstractmethod
+    def get_counts(self, aviary_id: int, count_date: date) -> Dict[int, int]:
+        pass
+
+    @abstractmethod
+    def save_counts(self, aviary_id: int, count_date: date, fila_counts: Dict[int, int]) -> None:
+        pass
+
+    @abstractmethod
+    def record_writes(self, sent: int, skipped: int) -> None:
+        pass
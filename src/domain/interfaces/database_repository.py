@@ -1,8 +1,39 @@
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import List
+from typing import Dict, List, Optional, Tuple, Union
+
+class WriteRejected(Exception):
+    """Raised when the database refuses the counts themselves, so retrying the same write cannot succeed."""
+
 
 class DatabaseRepository(ABC):
     @abstractmethod
     def upsert_egg_counts(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict) -> bool:
+        """Returns False when the write failed for a transient reason; raises WriteRejected when it never can succeed."""
         pass
+
+    def upsert_egg_counts_for_days(self, aviary_id: int,
+                                   days: Dict[date, Tuple[List[int], dict]]) -> Dict[date, Union[bool, WriteRejected]]:
+        """Upserts several days of one aviary; each day maps to what `upsert_egg_counts` returned or raised.
+
+        Repositories that can write several days per round trip override this.
+        """
+        outcomes: Dict[date, Union[bool, WriteRejected]] = {}
+        for count_date, (counts, fila_mapping) in days.items():
+            try:
+                outcomes[count_date] = self.upsert_egg_counts(aviary_id, count_date, counts, fila_mapping)
+            except WriteRejected as e:
+                outcomes[count_date] = e
+        return outcomes
+
+    def prefetch_lote_ids(self, aviary_ids: List[int], count_date: date) -> int:
+        """Optionally warms lookups for a whole run; returns how many aviaries were found."""
+        return 0
+
+    def fetch_stored_counts(self, aviary_ids: List[int], start: date,
+                            end: date) -> Optional[Dict[Tuple[int, date], Dict[int, int]]]:
+        """Reads back stored counts as (aviary, date) -> {fila: count}, or None when the read fails.
+
+        (aviary, date) pairs with no rows are left out.
+        """
+        return {}
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from src.domain.entities.egg_count_job import EggCountJob
+
+class EggCountJobRepository(ABC):
+    @abstractmethod
+    def save(self, job: EggCountJob) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[EggCountJob]:
+        pass
+
+    @abstractmethod
+    def prune(self, max_finished: int) -> None:
+        """Keeps only the `max_finished` most recently finished jobs (queued and running ones stay)."""
+        pass
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+
+class LeaderLock(ABC):
+    """Exclusive lock held by at most one collector process; released when the holder dies."""
+
+    @abstractmethod
+    def try_acquire(self) -> bool:
+        """Takes the lock without waiting; returns whether this process now holds it."""
+        pass
+
+    @abstractmethod
+    def is_held(self) -> bool:
+        pass
+
+    @abstractmethod
+    def release(self) -> None:
+        pass
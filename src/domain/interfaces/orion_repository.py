@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Optional, Sequence
 
 class OrionDeviceRepository(ABC):
     @abstractmethod
-    def fetch_egg_counts(self, aviary_id: int, date: str) -> Optional[List[int]]:
+    def fetch_egg_counts(self, aviary_id: int, date: str) -> Optional[Sequence[int]]:
         pass
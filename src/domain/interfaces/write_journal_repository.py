@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List, Optional
+from src.domain.entities.pending_write import PendingWrite
+
+class WriteJournalRepository(ABC):
+    @abstractmethod
+    def append(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict,
+               read_at: Optional[float] = None) -> int:
+        pass
+
+    @abstractmethod
+    def is_pending(self, entry_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def supersede(self, aviary_id: int, count_date: date, read_at: float) -> None:
+        """Drops the pending entries of the aviary/date read no later than `read_at`, once a newer write landed."""
+        pass
+
+    @abstractmethod
+    def due(self, limit: int) -> List[PendingWrite]:
+        """Returns up to `limit` entries ready to retry, claimed so no other flusher takes them meanwhile."""
+        pass
+
+    @abstractmethod
+    def remove(self, entry_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def reschedule(self, entry_id: int, reason: str = "") -> bool:
+        """Backs the entry off after a transient failure; returns False once it ran out of attempts and failed."""
+        pass
+
+    @abstractmethod
+    def fail(self, entry_id: int, reason: str) -> None:
+        """Moves the entry out of the queue for good, e.g. when the database rejected it."""
+        pass
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+from src.infrastructure.aviary_registry import AviaryRegistry
+
+logger = logging.getLogger(__name__)
+
+class AviaryConfigWatcher:
+    """Background task that reloads the aviary registry when its config file changes."""
+
+    def __init__(self, registry: AviaryRegistry, interval_seconds: float):
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._last_mtime: Optional[float] = None
+
+    def start(self):
+        self._last_mtime = self._mtime()
+        self._task = asyncio.ensure_future(self._run())
+        logger.info(f"Watching aviary config {self.registry.config_path}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Aviary config watcher stopped")
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.registry.config_path).st_mtime
+        except OSError:
+            return None
+
+    def check_once(self) -> bool:
+        """Reloads the registry if the file changed since the last check; returns whether it did."""
+        mtime = self._mtime()
+        if mtime is None or mtime == self._last_mtime:
+            return False
+        self._last_mtime = mtime
+        try:
+            self.registry.load()
+        except ValueError as e:
+            # A half-written or invalid file leaves the current registry in place
+            logger.error(f"Aviary config reload failed, keeping the current config: {str(e)}")
+            return False
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"Aviary config watch failed: {str(e)}")
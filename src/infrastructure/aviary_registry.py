@@ -0,0 +1,147 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from src.config.settings import AVIARY_SOURCE_SETTINGS, AviaryConfig, load_aviary_source
+from src.domain.entities.fila_mapping import shared_fila_mapping
+from src.infrastructure import metrics
+from src.infrastructure.orion.async_client import AsyncOrionClient
+from src.infrastructure.orion.connection_pool import orion_pool
+from src.infrastructure.orion.controller_health import controller_health
+
+logger = logging.getLogger(__name__)
+
+
+class AviaryEntry:
+    """Everything the request path needs for one aviary, built once per config load."""
+
+    __slots__ = ("aviary_id", "config", "client", "fila_mapping")
+
+    def __init__(self, aviary_id: int, config: AviaryConfig):
+        self.aviary_id = aviary_id
+        self.config = config
+        self.fila_mapping = shared_fila_mapping(config.fila_mapping)
+        self.client = AsyncOrionClient(
+            ip=config.ip,
+            port=config.port,
+            devcmd=config.devcmd,
+            num_rows=config.num_rows,
+            target_cmd=config.target_cmd,
+            response_size=config.response_size
+        )
+
+
+@dataclass
+class ReloadReport:
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    changed: List[int] = field(default_factory=list)
+    closed_controllers: List[str] = field(default_factory=list)
+    working_aviaries: List[int] = field(default_factory=list)
+
+
+class AviaryRegistry:
+    """Aviary configs, the working-aviary set and their long-lived Orion clients.
+
+    Configs are parsed by an explicit `load()` at startup (or on first use when nothing loaded
+    them), never on import. Readers get immutable snapshots, so a later load swaps everything at
+    once. A reload keeps the entries (and warm connections) of unchanged aviaries, and only closes
+    the connections of controllers that no aviary uses any more, including ones in use at the time.
+    """
+
+    def __init__(self, config_path: str = ""):
+        self.config_path = config_path
+        self._entries: Mapping[int, AviaryEntry] = MappingProxyType({})
+        self._configs: Mapping[int, AviaryConfig] = MappingProxyType({})
+        self._working_aviaries: Tuple[int, ...] = ()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, configs: Optional[Dict[int, AviaryConfig]] = None,
+             working_aviaries: Optional[List[int]] = None) -> ReloadReport:
+        """(Re)builds the registry from `configs`, or from the config source; raises ValueError on a bad source."""
+        if configs is None or working_aviaries is None:
+            # One read of the source, so configs and working set always come from the same version of the file
+            source_configs, source_working = load_aviary_source(self.config_path or None)
+            configs = source_configs if configs is None else configs
+            working_aviaries = source_working if working_aviaries is None else working_aviaries
+
+        with self._lock:
+            previous = self._entries
+            report = ReloadReport(working_aviaries=list(working_aviaries))
+            entries = {}
+            for aviary_id, config in configs.items():
+                old = previous.get(aviary_id)
+                if old is not None and old.config == config:
+                    entries[aviary_id] = old
+                    continue
+                entries[aviary_id] = AviaryEntry(aviary_id, config)
+                (report.added if old is None else report.changed).append(aviary_id)
+            report.removed = sorted(set(previous) - set(entries))
+
+            self._entries = MappingProxyType(entries)
+            self._configs = MappingProxyType({aviary_id: entry.config for aviary_id, entry in entries.items()})
+            self._working_aviaries = tuple(working_aviaries)
+            first_load = not self._loaded
+            self._loaded = True
+
+        report.closed_controllers = self._close_unused_controllers(previous.values(), entries.values())
+        metrics.set_aviary_blocks({aviary_id: config.block for aviary_id, config in configs.items()})
+        missing = [aviary_id for aviary_id in working_aviaries if aviary_id not in entries]
+        if missing:
+            logger.error(f"Working aviaries without config: {missing}")
+        if first_load:
+            logger.info(f"Aviary registry loaded: {len(entries)} aviaries, {len(working_aviaries)} working")
+        else:
+            logger.info(f"Aviary registry reloaded: added {report.added}, removed {report.removed}, "
+                        f"changed {report.changed}, closed controllers {report.closed_controllers}")
+        return report
+
+    @staticmethod
+    def _close_unused_controllers(old_entries, new_entries) -> List[str]:
+        in_use = {(entry.config.ip, entry.config.port) for entry in new_entries}
+        stale = {(entry.config.ip, entry.config.port) for entry in old_entries} - in_use
+        for ip, port in in_use:
+            orion_pool.reinstate(ip, port)
+        for ip, port in sorted(stale):
+            # Also closes connections still lent to in-flight reads once they are released
+            orion_pool.retire(ip, port)
+            if all(ip != used_ip for used_ip, _ in in_use):
+                controller_health.forget(ip)
+        return [f"{ip}:{port}" for ip, port in sorted(stale)]
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                loaded = self._loaded
+            if not loaded:
+                self.load()
+
+    @property
+    def configs(self) -> Mapping[int, AviaryConfig]:
+        self._ensure_loaded()
+        return self._configs
+
+    @property
+    def working_aviaries(self) -> Tuple[int, ...]:
+        self._ensure_loaded()
+        return self._working_aviaries
+
+    def get(self, aviary_id: int) -> Optional[AviaryEntry]:
+        self._ensure_loaded()
+        return self._entries.get(aviary_id)
+
+    def __getitem__(self, aviary_id: int) -> AviaryEntry:
+        self._ensure_loaded()
+        return self._entries[aviary_id]
+
+    def __contains__(self, aviary_id: int) -> bool:
+        self._ensure_loaded()
+        return aviary_id in self._entries
+
+    def block_aviaries(self, block: str) -> List[int]:
+        return sorted(aviary_id for aviary_id, config in self.configs.items() if config.block == block)
+
+
+aviary_registry = AviaryRegistry(AVIARY_SOURCE_SETTINGS["config_path"])
@@ -1,5 +1,12 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 import pyodbc
-from src.config.settings import DATABASE_SETTINGS
+from src.config.settings import DATABASE_SETTINGS, DATABASE_POOL_SETTINGS
+
+logger = logging.getLogger(__name__)
 
 def create_db_connection():
     conn_str = (
@@ -14,5 +21,111 @@ def create_db_connection():
         conn.autocommit = False
         return conn
     except Exception as e:
-        print(f"Database connection error: {e}")
+        logger.error(f"Database connection error: {e}")
         return None
+
+
+class DatabaseConnectionPool:
+    """Bounded, thread-safe pool of ODBC connections.
+
+    Connections are validated with a cheap query when checked out, and connections idle for
+    longer than `max_idle_seconds` are closed instead of reused.
+    """
+
+    def __init__(self, factory, max_size: int, max_idle_seconds: float, checkout_timeout: float):
+        self.factory = factory
+        self.max_idle_seconds = max_idle_seconds
+        self.checkout_timeout = checkout_timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = deque()  # (connection, last_used)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            logger.error("Timed out waiting for a pooled database connection")
+            return None
+        try:
+            conn = self._checkout_idle()
+            if conn is None:
+                conn = self.factory()
+            if conn is None:
+                self._slots.release()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard: bool = False):
+        try:
+            if not discard:
+                try:
+                    conn.rollback()  # Never hand out a connection with an open transaction
+                except pyodbc.Error:
+                    discard = True
+            if discard:
+                self._close(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Yields a pooled connection (or None when the database is unreachable) for one unit of work."""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except pyodbc.Error:
+            discard = True
+            raise
+        finally:
+            if conn is not None:
+                self.release(conn, discard=discard)
+
+    def close_all(self):
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _checkout_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, last_used = self._idle.pop()
+            if time.monotonic() - last_used > self.max_idle_seconds:
+                self._close(conn)
+                continue
+            if self._is_valid(conn):
+                return conn
+            self._close(conn)
+
+    @staticmethod
+    def _is_valid(conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+
+db_pool = DatabaseConnectionPool(
+    create_db_connection,
+    max_size=DATABASE_POOL_SETTINGS["max_size"],
+    max_idle_seconds=DATABASE_POOL_SETTINGS["max_idle_seconds"],
+    checkout_timeout=DATABASE_POOL_SETTINGS["checkout_timeout"],
+)
@@ -0,0 +1,53 @@
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+MISSING = object()
+
+
+class LoteIdCache:
+    """In-process cache of (aviary, date) -> lote_id.
+
+    Known lotes are kept until their date falls out of the retention window. "No lote yet" answers
+    are cached for `negative_ttl_seconds` only, so a lote created later in the day is picked up.
+    """
+
+    def __init__(self, negative_ttl_seconds: float, retention_days: int):
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.retention_days = retention_days
+        self._entries: Dict[Tuple[int, date], Tuple[Optional[int], float]] = {}
+        self._newest_date: Optional[date] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, aviario_id: int, count_date: date):
+        """Returns the cached lote_id (None for a cached "no lote"), or MISSING."""
+        with self._lock:
+            entry = self._entries.get((aviario_id, count_date))
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            return entry[0]
+
+    def put(self, aviario_id: int, count_date: date, lote_id: Optional[int]):
+        expires_at = float("inf") if lote_id else time.monotonic() + self.negative_ttl_seconds
+        with self._lock:
+            self._entries[(aviario_id, count_date)] = (lote_id, expires_at)
+            if self._newest_date is None or count_date > self._newest_date:
+                self._newest_date = count_date
+                self._evict_before(count_date - timedelta(days=self.retention_days - 1))
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._newest_date = None
+
+    def _evict_before(self, oldest: date):
+        for key in [key for key in self._entries if key[1] < oldest]:
+            del self._entries[key]
@@ -0,0 +1,84 @@
+import logging
+import pyodbc
+from src.domain.interfaces.leader_lock import LeaderLock
+from src.infrastructure.database.connection import create_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+class SqlServerLeaderLock(LeaderLock):
+    """Session-owned sp_getapplock on SQL Server: for replicas on different hosts.
+
+    The lock lives as long as the dedicated connection that took it (not a pooled one), so SQL
+    Server releases it when the holder dies or its connection is dropped.
+    """
+
+    def __init__(self, resource: str, connection_factory=create_db_connection):
+        self.resource = resource
+        self.connection_factory = connection_factory
+        self._conn = None
+
+    def try_acquire(self) -> bool:
+        if self._conn is not None:
+            return self.is_held()
+        conn = self.connection_factory()
+        if conn is None:
+            return False
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(
+                "SET NOCOUNT ON; DECLARE @result INT; "
+                "EXEC @result = sp_getapplock @Resource = ?, @LockMode = 'Exclusive', "
+                "@LockOwner = 'Session', @LockTimeout = 0; "
+                "SELECT @result",
+                self.resource
+            )
+            result = cursor.fetchone()[0]
+            cursor.close()
+        except pyodbc.Error as e:
+            logger.error(f"sp_getapplock for {self.resource} failed: {e}")
+            self._close(conn)
+            return False
+        if result < 0:
+            self._close(conn)
+            return False
+        self._conn = conn
+        return True
+
+    def is_held(self) -> bool:
+        if self._conn is None:
+            return False
+        try:
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT APPLOCK_MODE('public', ?, 'Session')", self.resource)
+            mode = cursor.fetchone()[0]
+            cursor.close()
+        except pyodbc.Error as e:
+            logger.error(f"Checking the {self.resource} lock failed: {e}")
+            mode = None
+        if mode != "Exclusive":
+            self._close(self._conn)
+            self._conn = None
+            return False
+        return True
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            cursor = self._conn.cursor()
+            cursor.execute("EXEC sp_releaseapplock @Resource = ?, @LockOwner = 'Session'", self.resource)
+            cursor.close()
+        except pyodbc.Error as e:
+            logger.error(f"sp_releaseapplock for {self.resource} failed: {e}")
+        finally:
+            self._close(self._conn)
+            self._conn = None
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
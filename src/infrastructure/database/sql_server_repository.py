@@ -1,89 +1,286 @@
 import pyodbc
-from datetime import date
-from typing import List, Optional
-from src.domain.interfaces.database_repository import DatabaseRepository
-from .connection import create_db_connection
+import re
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple, Union
+from src.domain.interfaces.database_repository import DatabaseRepository, WriteRejected
+from src.config.settings import DATABASE_SETTINGS, LOTE_CACHE_SETTINGS
+from src.infrastructure import metrics
+from .connection import db_pool
+from .lote_cache import MISSING, LoteIdCache
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+lote_cache = LoteIdCache(
+    negative_ttl_seconds=LOTE_CACHE_SETTINGS["negative_ttl_seconds"],
+    retention_days=LOTE_CACHE_SETTINGS["retention_days"],
+)
+
 class SqlServerRepository(DatabaseRepository):
-    def get_lote_id(self, aviario_id: int, count_date: date) -> Optional[int]:
-        conn = create_db_connection()
-        if not conn:
-            print("Failed to connect to database")
-            return None
+    def get_lote_id(self, aviario_id: int, count_date: date, conn=None) -> Optional[int]:
+        cached = lote_cache.get(aviario_id, count_date)
+        if cached is not MISSING:
+            return cached
+        if conn is None:
+            with db_pool.connection() as pooled_conn:
+                if not pooled_conn:
+                    metrics.count(metrics.DB_ERRORS, aviario_id)
+                    logger.error("Failed to connect to database")
+                    return None
+                return self.get_lote_id(aviario_id, count_date, pooled_conn)
         try:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT lote_id FROM prm_pro_registroDiario_00 "
-                "WHERE fecha = ? AND avi_id = ?",
-                count_date, aviario_id
-            )
-            result = cursor.fetchone()
-            return result[0] if result else None
+            with metrics.observe(metrics.DB_LOTE_ID_SECONDS, aviario_id):
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT lote_id FROM prm_pro_registroDiario_00 "
+                    "WHERE fecha = ? AND avi_id = ?",
+                    count_date, aviario_id
+                )
+                result = cursor.fetchone()
+            lote_id = result[0] if result else None
+            lote_cache.put(aviario_id, count_date, lote_id)
+            return lote_id
         except Exception as e:
-            print(f"Error getting lote_id: {e}")
+            metrics.count(metrics.DB_ERRORS, aviario_id)
+            logger.error(f"Error getting lote_id for aviario {aviario_id}: {e}")
             return None
-        finally:
-            conn.close()
+
+    def prefetch_lote_ids(self, aviario_ids: List[int], count_date: date) -> int:
+        """Loads the lote_id of every aviary for a date in one query; returns how many were found."""
+        if not aviario_ids:
+            return 0
+        with db_pool.connection() as conn:
+            if not conn:
+                logger.error("Failed to connect to database")
+                return 0
+            try:
+                cursor = conn.cursor()
+                placeholders = ", ".join("?" * len(aviario_ids))
+                cursor.execute(
+                    "SELECT avi_id, lote_id FROM prm_pro_registroDiario_00 "
+                    f"WHERE fecha = ? AND avi_id IN ({placeholders})",
+                    count_date, *aviario_ids
+                )
+                found = {}
+                for avi_id, lote_id in cursor.fetchall():
+                    found.setdefault(avi_id, lote_id)
+            except Exception as e:
+                logger.error(f"Error prefetching lote_ids: {e}")
+                return 0
+        for aviario_id in aviario_ids:
+            lote_cache.put(aviario_id, count_date, found.get(aviario_id))
+        return sum(1 for lote_id in found.values() if lote_id)
+
+    def fetch_stored_counts(self, aviario_ids: List[int], start: date,
+                            end: date) -> Optional[Dict[Tuple[int, date], Dict[int, int]]]:
+        if not aviario_ids:
+            return {}
+        with db_pool.connection() as conn:
+            if not conn:
+                logger.error("Failed to connect to database")
+                return None
+            try:
+                cursor = conn.cursor()
+                placeholders = ", ".join("?" * len(aviario_ids))
+                cursor.execute(
+                    "SELECT rghuevos_id_aviario, rghuevos_fecha, rghuevos_fila, rghuevos_orion "
+                    f"FROM {_egg_counts_table()} "
+                    f"WHERE rghuevos_fecha BETWEEN ? AND ? AND rghuevos_id_aviario IN ({placeholders})",
+                    start, end, *aviario_ids
+                )
+                stored: Dict[Tuple[int, date], Dict[int, int]] = {}
+                for aviario_id, fecha, fila, orion in cursor.fetchall():
+                    if isinstance(fecha, datetime):
+                        fecha = fecha.date()
+                    stored.setdefault((aviario_id, fecha), {})[fila] = orion
+                return stored
+            except Exception as e:
+                logger.error(f"Error reading stored egg counts: {e}")
+                return None
 
     def upsert_egg_counts(self, aviario_id: int, count_date: date, counts: List[int], fila_mapping: dict) -> bool:
-        conn = create_db_connection()
-        if not conn:
-            print("Failed to connect to database")
+        results = self.upsert_egg_count_rows(aviario_id, count_date, counts, fila_mapping)
+        return self._check_results(aviario_id, count_date, counts, results)
+
+    def _check_results(self, aviario_id: int, count_date: date, counts: List[int],
+                       results: Optional[List[Tuple[int, int, str]]]) -> bool:
+        if results is None:
             return False
-        lote_id = self.get_lote_id(aviario_id, count_date)
-        if not lote_id:
-            print(f"No lote_id found for aviario {aviario_id} on date {count_date}")
+        rejected = [f"fila {fila}: {mensaje}" for fila, tipo, mensaje in results if tipo != 1]
+        if rejected:
+            for reason in rejected:
+                logger.error(f"Error for aviario {aviario_id} on {count_date} {reason}")
+            raise WriteRejected(f"Stored procedure rejected {len(rejected)} filas of aviario {aviario_id}: {rejected[0]}")
+        if len(results) != len(counts):
+            logger.error(f"Expected {len(counts)} results for aviario {aviario_id}, got {len(results)}")
             return False
-        success = True
+        logger.info(f"Egg counts upserted successfully for aviario {aviario_id} on date {count_date}")
+        return True
+
+    def upsert_egg_count_rows(self, aviario_id: int, count_date: date, counts: List[int],
+                              fila_mapping: dict) -> Optional[List[Tuple[int, int, str]]]:
+        """Upserts every fila of an aviary in one batch and one transaction.
+
+        Returns the stored procedure's (fila, tipo, mensaje) output for each fila, or None when
+        nothing could be written, including when the aviary has no lote for the date yet.
+        """
+        return self.upsert_egg_count_rows_for_days(aviario_id, {count_date: (counts, fila_mapping)})[count_date]
+
+    def upsert_egg_counts_for_days(self, aviario_id: int,
+                               days: Dict[date, Tuple[List[int], dict]]) -> Dict[date, Union[bool, WriteRejected]]:
+        outcomes: Dict[date, Union[bool, WriteRejected]] = {}
+        for count_date, results in self.upsert_egg_count_rows_for_days(aviario_id, days).items():
+            try:
+                outcomes[count_date] = self._check_results(aviario_id, count_date, days[count_date][0], results)
+            except WriteRejected as e:
+                outcomes[count_date] = e
+        return outcomes
+
+    def upsert_egg_count_rows_for_days(self, aviario_id: int, days: Dict[date, Tuple[List[int], dict]]
+                              ) -> Dict[date, Optional[List[Tuple[int, int, str]]]]:
+        """Upserts several days of one aviary, packing whole days into batches of up to MAX_ROWS_PER_BATCH rows.
+
+        Each batch is one round trip and one transaction. Returns the (fila, tipo, mensaje) output per
+        day, or None for a day that could not be written, including one with no lote yet.
+        """
+        outcomes: Dict[date, Optional[List[Tuple[int, int, str]]]] = {count_date: None for count_date in days}
+        with db_pool.connection() as conn:
+            if not conn:
+                metrics.count(metrics.DB_ERRORS, aviario_id)
+                logger.error("Failed to connect to database")
+                return outcomes
+            batches: List[List[Tuple[date, int, int, int]]] = []
+            for count_date, (counts, fila_mapping) in sorted(days.items()):
+                lote_id = self.get_lote_id(aviario_id, count_date, conn)
+                if not lote_id:
+                    # Transient: the lote may still be created later in the day (see LOTE_CACHE_NEGATIVE_TTL_SECONDS)
+                    logger.error(f"No lote_id found for aviario {aviario_id} on date {count_date}")
+                    continue
+                rows = [(count_date, lote_id, fila_mapping[index], count) for index, count in enumerate(counts)]
+                # A day is never split across transactions; one larger than a batch gets a transaction of its own
+                if batches and len(batches[-1]) + len(rows) <= MAX_ROWS_PER_BATCH:
+                    batches[-1].extend(rows)
+                else:
+                    batches.append(rows)
+            for rows in batches:
+                results = self._upsert_batch(conn, aviario_id, rows)
+                if results is None:
+                    continue
+                for count_date in {row[0] for row in rows}:
+                    outcomes[count_date] = [(fila, tipo, mensaje) for fecha, fila, tipo, mensaje in results
+                                            if fecha == count_date]
+        return outcomes
+
+    def _upsert_batch(self, conn, aviario_id: int,
+                      rows: List[Tuple[date, int, int, int]]) -> Optional[List[Tuple[date, int, int, str]]]:
         try:
             cursor = conn.cursor()
-            sql = """
-            DECLARE @tipo INT
-            DECLARE @mensaje NVARCHAR(255)
-            EXEC dbo.sp_insertar_actualizar_regdia_huevos_orion
-                @rghuevos_id = NULL,
-                @rghuevos_fecha = ?,
-                @rghuevos_id_lote = ?,
-                @rghuevos_id_aviario = ?,
-                @rghuevos_fila = ?,
-                @rghuevos_orion = ?,
-                @tipo = @tipo OUTPUT,
-                @mensaje = @mensaje OUTPUT
-            SELECT @tipo AS tipo, @mensaje AS mensaje
-            """
-            for index, count in enumerate(counts):
-                fila = fila_mapping[index]
-                #print(f"Executing for fila {fila}: date={count_date}, lote_id={lote_id}, aviario_id={aviario_id}, count={count}")
-                try:
-                    cursor.execute(sql, count_date, lote_id, aviario_id, fila, count)
-                    while cursor.description is None and cursor.nextset():
-                        pass
-                    result = cursor.fetchone()
-                    if result:
-                        tipo, mensaje = result
-                        if tipo == 1:
-                            pass
-                            #print(f"Success for fila {fila}: {mensaje}")
-                        else:
-                            print(f"Error for fila {fila}: {mensaje}")
-                            success = False
-                    else:
-                        print(f"No output received for fila {fila}")
-                        success = False
-                    conn.commit()
-                except pyodbc.Error as e:
-                    print(f"Database error for fila {fila}: {e}")
-                    conn.rollback()
-                    success = False
-            logging.info(f"Egg counts upserted successfully for aviario {aviario_id} on date {count_date}")
-            return success
+            results = []
+            started = time.perf_counter()
+            for start in range(0, len(rows), MAX_ROWS_PER_BATCH):
+                chunk = rows[start:start + MAX_ROWS_PER_BATCH]
+                params = [aviario_id]
+                for row in chunk:
+                    params.extend(row)
+                cursor.execute(_batch_upsert_sql(len(chunk)), *params)
+                results.extend(_fetch_batch_results(cursor))
+            conn.commit()
+            labels = metrics.aviary_labels(aviario_id)
+            metrics.DB_UPSERT_SECONDS.labels(**labels).observe(time.perf_counter() - started)
+            fila_seconds = metrics.DB_FILA_SECONDS.labels(**labels)
+            for _, _, _, _, duracion_us in results:
+                if duracion_us is not None:
+                    fila_seconds.observe(duracion_us / 1_000_000)
+            return [
+                (fecha.date() if isinstance(fecha, datetime) else fecha, fila, tipo, mensaje)
+                for fecha, fila, tipo, mensaje, _ in results
+            ]
+        except pyodbc.Error as e:
+            metrics.count(metrics.DB_ERRORS, aviario_id)
+            logger.error(f"Database error for aviario {aviario_id}: {e}")
+            conn.rollback()
+            return None
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            metrics.count(metrics.DB_ERRORS, aviario_id)
+            logger.error(f"Unexpected error for aviario {aviario_id}: {e}")
             conn.rollback()
-            return False
-        finally:
-            conn.close()
+            return None
+
+
+def _egg_counts_table() -> str:
+    # The name comes from configuration and is interpolated into SQL, so only plain identifiers are accepted
+    name = DATABASE_SETTINGS["egg_counts_table"]
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*", name):
+        raise ValueError(f"Invalid egg counts table name: {name!r}")
+    return ".".join(f"[{part}]" for part in name.split("."))
+
+
+# Four parameters per row keeps each batch under SQL Server's limit of 2100 parameters per request
+MAX_ROWS_PER_BATCH = 500
+
+BATCH_UPSERT_SQL = """
+SET NOCOUNT ON
+DECLARE @aviario_id INT = ?
+DECLARE @rows TABLE (ord INT IDENTITY(1, 1), fecha DATE, lote_id INT, fila INT, orion INT)
+INSERT INTO @rows (fecha, lote_id, fila, orion) VALUES {values}
+DECLARE @results TABLE (fecha DATE, fila INT, tipo INT, mensaje NVARCHAR(255), duracion_us INT)
+DECLARE @fecha DATE, @lote_id INT, @fila INT, @orion INT, @tipo INT, @mensaje NVARCHAR(255), @inicio DATETIME2(7)
+DECLARE filas CURSOR LOCAL FAST_FORWARD FOR SELECT fecha, lote_id, fila, orion FROM @rows ORDER BY ord
+IF @@TRANCOUNT = 0 BEGIN TRANSACTION
+OPEN filas
+FETCH NEXT FROM filas INTO @fecha, @lote_id, @fila, @orion
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    SET @tipo = NULL
+    SET @mensaje = NULL
+    SET @inicio = SYSDATETIME()
+    SAVE TRANSACTION fila;
+    BEGIN TRY
+        EXEC dbo.sp_insertar_actualizar_regdia_huevos_orion
+            @rghuevos_id = NULL,
+            @rghuevos_fecha = @fecha,
+            @rghuevos_id_lote = @lote_id,
+            @rghuevos_id_aviario = @aviario_id,
+            @rghuevos_fila = @fila,
+            @rghuevos_orion = @orion,
+            @tipo = @tipo OUTPUT,
+            @mensaje = @mensaje OUTPUT
+    END TRY
+    BEGIN CATCH
+        -- An error that leaves the transaction uncommittable, or ends it, fails the whole batch
+        IF XACT_STATE() <> 1 THROW;
+        -- Otherwise only this fila's work is undone and it is reported like a rejected fila
+        ROLLBACK TRANSACTION fila;
+        SET @tipo = {error_tipo}
+        SET @mensaje = LEFT(ERROR_MESSAGE(), 255)
+    END CATCH
+    INSERT INTO @results (fecha, fila, tipo, mensaje, duracion_us)
+    VALUES (@fecha, @fila, @tipo, @mensaje, DATEDIFF(MICROSECOND, @inicio, SYSDATETIME()))
+    FETCH NEXT FROM filas INTO @fecha, @lote_id, @fila, @orion
+END
+CLOSE filas
+DEALLOCATE filas
+SELECT fecha, fila, tipo, mensaje, duracion_us FROM @results
+"""
+
+
+# Reported as the tipo of a fila whose stored procedure call raised an error instead of returning one
+ERROR_TIPO = 0
+
+BATCH_RESULT_COLUMNS = ["fecha", "fila", "tipo", "mensaje", "duracion_us"]
+
+
+def _batch_upsert_sql(row_count: int) -> str:
+    return BATCH_UPSERT_SQL.format(values=", ".join(["(?, ?, ?, ?)"] * row_count), error_tipo=ERROR_TIPO)
+
+
+def _fetch_batch_results(cursor) -> List[Tuple[date, int, int, str, int]]:
+    # The stored procedure may emit result sets of its own; the batch output is the last one
+    results = []
+    while True:
+        if cursor.description is not None and [column[0] for column in cursor.description] == BATCH_RESULT_COLUMNS:
+            results = [tuple(row) for row in cursor.fetchall()]
+        if not cursor.nextset():
+            return results
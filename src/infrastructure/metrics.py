@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+DEVICE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DATABASE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+AVIARY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+ORION_CONNECT_SECONDS = Histogram(
+    "orion_connect_seconds", "TCP connect time to an Orion controller", ["aviary", "block"], buckets=DEVICE_BUCKETS
+)
+ORION_HANDSHAKE_SECONDS = Histogram(
+    "orion_handshake_seconds", "Init command round trip", ["aviary", "block"], buckets=DEVICE_BUCKETS
+)
+ORION_PAYLOAD_SECONDS = Histogram(
+    "orion_payload_receive_seconds", "Count request round trip until the full frame is received",
+    ["aviary", "block"], buckets=DEVICE_BUCKETS
+)
+ORION_TIMEOUTS = Counter("orion_timeouts_total", "Orion connect or read timeouts", ["aviary", "block"])
+ORION_FRAME_ERRORS = Counter(
+    "orion_frame_errors_total", "Invalid Orion frames (payload length, checksum, format)", ["aviary", "block"]
+)
+ORION_SOCKET_ERRORS = Counter("orion_socket_errors_total", "Orion socket errors", ["aviary", "block"])
+ORION_CIRCUIT_REJECTIONS = Counter(
+    "orion_circuit_rejections_total", "Reads skipped because the controller's circuit breaker is open",
+    ["aviary", "block"]
+)
+
+DB_LOTE_ID_SECONDS = Histogram(
+    "db_get_lote_id_seconds", "lote_id lookup time (cache misses only)", ["aviary", "block"], buckets=DATABASE_BUCKETS
+)
+DB_UPSERT_SECONDS = Histogram(
+    "db_upsert_batch_seconds", "Batched stored procedure upsert time for one aviary", ["aviary", "block"],
+    buckets=DATABASE_BUCKETS
+)
+DB_FILA_SECONDS = Histogram(
+    "db_upsert_fila_seconds", "sp_insertar_actualizar_regdia_huevos_orion time per fila, measured on the server",
+    ["aviary", "block"], buckets=DATABASE_BUCKETS
+)
+DB_ERRORS = Counter("db_errors_total", "Database connection and query errors", ["aviary", "block"])
+
+AVIARY_SECONDS = Histogram(
+    "aviary_processing_seconds", "End-to-end time to read and store one aviary", ["aviary", "block"],
+    buckets=AVIARY_BUCKETS
+)
+AVIARY_RETRIES = Counter("aviary_retries_total", "Scheduler retries of a failed aviary", ["aviary", "block"])
+JOURNAL_FAILED_WRITES = Counter(
+    "write_journal_failed_total", "Journaled writes given up on (rejected or out of attempts)", ["aviary", "block"]
+)
+SCHEDULER_ACTIVE = Gauge("scheduler_active", "1 while this process runs scheduled collection")
+
+
+_labels: Dict[int, Dict[str, str]] = {}
+
+
+def set_aviary_blocks(blocks: Dict[int, str]):
+    """Sets the block label of each aviary; called whenever aviary configs are loaded."""
+    global _labels
+    _labels = {aviary_id: {"aviary": str(aviary_id), "block": block} for aviary_id, block in blocks.items()}
+
+
+def aviary_labels(aviary_id: int) -> Dict[str, str]:
+    labels = _labels.get(aviary_id)
+    return labels if labels is not None else {"aviary": str(aviary_id), "block": ""}
+
+
+@contextmanager
+def observe(histogram: Histogram, aviary_id: int):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**aviary_labels(aviary_id)).observe(time.perf_counter() - started)
+
+
+def count(counter: Counter, aviary_id: int, amount: float = 1):
+    counter.labels(**aviary_labels(aviary_id)).inc(amount)
+
+
+def render_latest():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from array import array
+from typing import Optional
+from src.config.settings import ORION_SETTINGS
+from src.domain.interfaces.orion_repository import OrionDeviceRepository
+from src.infrastructure import metrics
+from . import protocol
+from .decoding import decode_frame
+from .connection_pool import OrionConnection, OrionConnectionPool, orion_pool
+from .controller_health import (
+    CONNECT,
+    COUNT,
+    DEFAULT_TIMEOUTS,
+    INIT,
+    ControllerHealth,
+    ControllerHealthRegistry,
+    controller_health,
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncOrionClient(OrionDeviceRepository):
+    """Orion client on asyncio streams, so many aviaries can be fetched on one event loop."""
+
+    def __init__(self, ip: str, port: int, devcmd: str, num_rows: int, target_cmd: str, response_size: int,
+                 pool: Optional[OrionConnectionPool] = None, health: Optional[ControllerHealthRegistry] = None):
+        self.ip = ip
+        self.port = port
+        self.devcmd = devcmd
+        self.num_rows = num_rows
+        self.target_cmd = target_cmd
+        self.target_frame = target_cmd.encode('ascii')
+        self.response_size = response_size
+        self.pool = pool or orion_pool
+        self.health: ControllerHealth = (health or controller_health).for_ip(ip)
+
+    def build_init_cmd(self, date: str) -> str:
+        return protocol.build_init_cmd(self.devcmd, date)
+
+    def init_frame(self, date: str) -> bytes:
+        return protocol.init_frame(self.devcmd, date)
+
+    def _timeout(self, stage: str) -> float:
+        if ORION_SETTINGS["adaptive_timeouts"]:
+            return self.health.latency.timeout(stage)
+        return DEFAULT_TIMEOUTS[stage]
+
+    async def _timed(self, stage: str, histogram, aviary_id: int, awaitable_factory):
+        """Runs one stage under its timeout and records its round trip; a timeout counts as a sample of that length."""
+        timeout = self._timeout(stage)
+        started = time.perf_counter()
+        try:
+            result = await awaitable_factory(timeout)
+        except asyncio.TimeoutError:
+            self.health.latency.record(stage, timeout)
+            raise
+        elapsed = time.perf_counter() - started
+        self.health.latency.record(stage, elapsed)
+        histogram.labels(**metrics.aviary_labels(aviary_id)).observe(elapsed)
+        return result
+
+    async def _send_and_read(self, conn: OrionConnection, command: bytes, size: int, timeout: float) -> bytes:
+        conn.writer.write(command)
+        await conn.writer.drain()
+        return await conn.frames.read_frame(size, timeout)
+
+    async def _exchange(self, conn: OrionConnection, aviary_id: int, date: str) -> array:
+        # With ORION_REUSE_INIT_SESSION, the init handshake is skipped when this connection is already set
+        # up for the same device and date; otherwise every read re-sends it and only the socket is reused
+        if not ORION_SETTINGS["reuse_init_session"] or conn.session != (self.devcmd, date):
+            conn.session = None
+            await self._timed(INIT, metrics.ORION_HANDSHAKE_SECONDS, aviary_id, lambda timeout: self._send_and_read(
+                conn, self.init_frame(date), protocol.INIT_RESPONSE_SIZE, timeout
+            ))
+            conn.session = (self.devcmd, date)
+
+        # Send count request and get egg counts with short timeout
+        count_frame = await self._timed(COUNT, metrics.ORION_PAYLOAD_SECONDS, aviary_id, lambda timeout: self._send_and_read(
+            conn, self.target_frame, self.response_size, timeout
+        ))
+        # Kept as the decoded array('H'); EggCount stores it without copying
+        return decode_frame(count_frame, self.num_rows, ORION_SETTINGS["verify_checksum"])
+
+    async def _acquire(self, aviary_id: int):
+        # Only new connections measure the controller's connect time
+        if self.pool.has_idle(self.ip, self.port):
+            return await self.pool.acquire(self.ip, self.port, self._timeout(CONNECT))
+        return await self._timed(CONNECT, metrics.ORION_CONNECT_SECONDS, aviary_id,
+                                 lambda timeout: self.pool.acquire(self.ip, self.port, timeout))
+
+    async def fetch_egg_counts(self, aviary_id: int, date: str) -> Optional[array]:
+        breaker = self.health.breaker
+        if not breaker.allow():
+            metrics.count(metrics.ORION_CIRCUIT_REJECTIONS, aviary_id)
+            logger.warning(f"Controller {self.ip} circuit open; skipping aviary {aviary_id} "
+                           f"(retry in {breaker.retry_after():.0f}s)")
+            return None
+        while True:
+            conn = None
+            reused = False
+            try:
+                conn, reused = await self._acquire(aviary_id)
+                counts = await self._exchange(conn, aviary_id, date)
+                self.pool.release(conn)
+                breaker.record_success()
+                return counts
+            except (protocol.FrameError, asyncio.TimeoutError, OSError) as e:
+                if conn is not None:
+                    self.pool.release(conn, reusable=False)
+                if reused:
+                    # A pooled connection may have been dropped by the controller; retry once on a fresh one
+                    continue
+                if isinstance(e, protocol.FrameError):
+                    # The controller answered, so it is reachable; the frame itself was bad
+                    breaker.record_success()
+                    metrics.count(metrics.ORION_FRAME_ERRORS, aviary_id)
+                    logger.error(f"Invalid frame from aviary {aviary_id}: {e}")
+                elif isinstance(e, asyncio.TimeoutError):
+                    breaker.record_failure()
+                    metrics.count(metrics.ORION_TIMEOUTS, aviary_id)
+                    logger.error(f"Timeout waiting for response from aviary {aviary_id}")
+                else:
+                    breaker.record_failure()
+                    metrics.count(metrics.ORION_SOCKET_ERRORS, aviary_id)
+                    logger.error(f"Socket error for aviary {aviary_id}: {e}")
+                return None
+            except BaseException:
+                if conn is not None:
+                    self.pool.release(conn, reusable=False)
+                raise
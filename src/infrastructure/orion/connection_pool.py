@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from src.config.settings import ORION_SETTINGS
+from . import protocol
+
+PoolKey = Tuple[str, int]
+
+
+class OrionConnection:
+    def __init__(self, key: PoolKey, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.frames = protocol.StreamFrameReader(reader)
+        self.session: Optional[Tuple[str, str]] = None  # (devcmd, date) of the last init handshake
+        self.last_used = time.monotonic()
+        self.loop = asyncio.get_event_loop()
+
+    def is_healthy(self, max_idle_seconds: float) -> bool:
+        # Streams are bound to the event loop that opened them
+        return (
+            self.loop is asyncio.get_event_loop()
+            and not self.loop.is_closed()
+            and not self.writer.is_closing()
+            and not self.reader.at_eof()
+            and time.monotonic() - self.last_used <= max_idle_seconds
+        )
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class OrionConnectionPool:
+    """Keeps open Orion connections per (ip, port) so aviaries behind one controller reuse them."""
+
+    def __init__(self, max_idle_per_controller: int, max_idle_seconds: float):
+        self.max_idle_per_controller = max_idle_per_controller
+        self.max_idle_seconds = max_idle_seconds
+        self._idle: Dict[PoolKey, List[OrionConnection]] = {}
+        self._retired: Set[PoolKey] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def acquire(self, ip: str, port: int,
+                      connect_timeout: float = protocol.CONNECT_TIMEOUT) -> Tuple[OrionConnection, bool]:
+        """Returns a connection and whether it was reused from the pool."""
+        key = (ip, port)
+        idle = self._idle.get(key, [])
+        while idle:
+            conn = idle.pop()
+            if conn.is_healthy(self.max_idle_seconds):
+                self.hits += 1
+                return conn, True
+            self.evictions += 1
+            conn.close()
+
+        self.misses += 1
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), connect_timeout)
+        return OrionConnection(key, reader, writer), False
+
+    def has_idle(self, ip: str, port: int) -> bool:
+        return bool(self._idle.get((ip, port)))
+
+    def release(self, conn: OrionConnection, reusable: bool = True):
+        if not reusable or conn.key in self._retired or conn.writer.is_closing():
+            conn.close()
+            return
+        idle = self._idle.setdefault(conn.key, [])
+        if len(idle) >= self.max_idle_per_controller:
+            conn.close()
+            return
+        conn.frames.buffer.clear()
+        conn.last_used = time.monotonic()
+        idle.append(conn)
+
+    def close_controller(self, ip: str, port: int):
+        for conn in self._idle.pop((ip, port), []):
+            conn.close()
+
+    def retire(self, ip: str, port: int):
+        """Closes the idle connections of a controller no aviary uses any more, and those still lent out on release."""
+        self._retired.add((ip, port))
+        self.close_controller(ip, port)
+
+    def reinstate(self, ip: str, port: int):
+        self._retired.discard((ip, port))
+
+    def close_all(self):
+        for key in list(self._idle):
+            self.close_controller(*key)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "idle": sum(len(conns) for conns in self._idle.values()),
+        }
+
+
+orion_pool = OrionConnectionPool(
+    max_idle_per_controller=ORION_SETTINGS["pool_max_idle_per_controller"],
+    max_idle_seconds=ORION_SETTINGS["pool_max_idle_seconds"],
+)
@@ -0,0 +1,147 @@
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from src.config.settings import ORION_SETTINGS
+from . import protocol
+
+CONNECT = "connect"
+INIT = "init"
+COUNT = "count"
+
+DEFAULT_TIMEOUTS = {
+    CONNECT: protocol.CONNECT_TIMEOUT,
+    INIT: protocol.INIT_RESPONSE_TIMEOUT,
+    COUNT: protocol.COUNT_RESPONSE_TIMEOUT,
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LatencyTracker:
+    """Recent round-trip times of one controller, per protocol stage."""
+
+    def __init__(self, window: int, min_samples: int, percentile: float, multiplier: float, floor_seconds: float):
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor_seconds = floor_seconds
+        self._samples: Dict[str, Deque[float]] = {stage: deque(maxlen=window) for stage in DEFAULT_TIMEOUTS}
+
+    def record(self, stage: str, seconds: float):
+        self._samples[stage].append(seconds)
+
+    def quantile(self, stage: str) -> Optional[float]:
+        samples = self._samples[stage]
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)]
+
+    def timeout(self, stage: str) -> float:
+        """`multiplier` times the observed percentile, between `floor_seconds` and the protocol default."""
+        default = DEFAULT_TIMEOUTS[stage]
+        observed = self.quantile(stage)
+        if observed is None:
+            return default
+        return min(default, max(self.floor_seconds, observed * self.multiplier))
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive failures, then lets one probe through per cooldown."""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.cooldown_seconds:
+            self.state = HALF_OPEN
+            self._probe_started = None
+        # A probe that never reported back (e.g. cancelled) is replaced after one cooldown
+        if self.state == HALF_OPEN and (self._probe_started is None
+                                        or now - self._probe_started >= self.cooldown_seconds):
+            self._probe_started = now
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown_seconds - time.monotonic())
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe_started = None
+
+
+class ControllerHealth:
+    def __init__(self, ip: str, latency: LatencyTracker, breaker: CircuitBreaker):
+        self.ip = ip
+        self.latency = latency
+        self.breaker = breaker
+
+
+class ControllerHealthRegistry:
+    """Latency tracking and a circuit breaker per controller (block) IP."""
+
+    def __init__(self, settings: dict):
+        self.settings = settings
+        self._controllers: Dict[str, ControllerHealth] = {}
+
+    def for_ip(self, ip: str) -> ControllerHealth:
+        health = self._controllers.get(ip)
+        if health is None:
+            health = ControllerHealth(
+                ip,
+                LatencyTracker(
+                    window=self.settings["latency_window"],
+                    min_samples=self.settings["latency_min_samples"],
+                    percentile=self.settings["timeout_percentile"],
+                    multiplier=self.settings["timeout_multiplier"],
+                    floor_seconds=self.settings["timeout_floor_seconds"],
+                ),
+                CircuitBreaker(
+                    failure_threshold=self.settings["breaker_failure_threshold"],
+                    cooldown_seconds=self.settings["breaker_cooldown_seconds"],
+                ),
+            )
+            self._controllers[ip] = health
+        return health
+
+    def forget(self, ip: str):
+        self._controllers.pop(ip, None)
+
+    def is_open(self, ip: str) -> bool:
+        health = self._controllers.get(ip)
+        return health is not None and health.breaker.state == OPEN and health.breaker.retry_after() > 0
+
+    def stats(self) -> dict:
+        return {
+            ip: {
+                "state": health.breaker.state,
+                "failures": health.breaker.failures,
+                "timeouts": {stage: round(health.latency.timeout(stage), 3) for stage in DEFAULT_TIMEOUTS},
+            }
+            for ip, health in self._controllers.items()
+        }
+
+
+controller_health = ControllerHealthRegistry(ORION_SETTINGS)
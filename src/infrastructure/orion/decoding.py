@@ -0,0 +1,104 @@
+import binascii
+import sys
+from array import array
+from typing import Iterable, List
+
+HEADER_SIZE = 15
+TRAILER_SIZE = 3
+_STAR = ord("*")
+_WHITESPACE = b" \t\r\n"
+
+
+class FrameError(Exception):
+    """Raised when an Orion frame is malformed, truncated or fails its checksum."""
+
+
+def xor_bytes(data) -> int:
+    """XOR of all bytes in `data`, folding the buffer in halves as one big integer."""
+    width = len(data)
+    value = int.from_bytes(data, "big")
+    while width > 1:
+        half = width // 2
+        value = (value >> (8 * half)) ^ (value & ((1 << (8 * half)) - 1))
+        width -= half
+    return value
+
+
+def _strip(view: memoryview) -> memoryview:
+    start, end = 0, len(view)
+    while start < end and view[start] in _WHITESPACE:
+        start += 1
+    while end > start and view[end - 1] in _WHITESPACE:
+        end -= 1
+    return view[start:end]
+
+
+def _decode_into(out: array, frame, num_rows: int, verify_checksum: bool):
+    view = _strip(memoryview(frame))
+    if len(view) != HEADER_SIZE + num_rows * 4 + TRAILER_SIZE:
+        raise FrameError(f"Invalid payload length: expected {num_rows * 4}, got {len(view) - HEADER_SIZE - TRAILER_SIZE}")
+
+    # The trailer is "*XX", the form the original parser stripped from device replies
+    trailer = view[-TRAILER_SIZE:]
+    if trailer[0] != _STAR:
+        raise FrameError(f"Missing '*' in frame trailer: {bytes(trailer)!r}")
+    checksum_hex = trailer[1:]
+    # XOR over header and payload; not yet confirmed against captured controller replies (ORION_VERIFY_CHECKSUM)
+    if verify_checksum:
+        try:
+            received = binascii.a2b_hex(checksum_hex)[0]
+        except (binascii.Error, ValueError):
+            raise FrameError(f"Invalid checksum field: {bytes(checksum_hex)!r}")
+        expected = xor_bytes(view[:-TRAILER_SIZE])
+        if received != expected:
+            raise FrameError(f"Checksum mismatch: expected {expected:02X}, got {received:02X}")
+
+    try:
+        raw = binascii.a2b_hex(view[HEADER_SIZE:-TRAILER_SIZE])
+    except (binascii.Error, ValueError):
+        raise FrameError("Payload is not hexadecimal")
+    out.frombytes(raw)
+
+
+def _to_host_order(counts: array) -> array:
+    # Counts are big-endian 16-bit words on the wire
+    if sys.byteorder == "little":
+        counts.byteswap()
+    return counts
+
+
+def decode_frame(frame, num_rows: int, verify_checksum: bool = True) -> array:
+    """Decodes one count frame (bytes or memoryview) into an array('H') of `num_rows` counts."""
+    counts = array("H")
+    _decode_into(counts, frame, num_rows, verify_checksum)
+    return _to_host_order(counts)
+
+
+class CountMatrix:
+    """Counts of many frames stored row-major in one flat array('H')."""
+
+    def __init__(self, num_rows: int, counts: array, rejected: List[int]):
+        self.num_rows = num_rows
+        self.counts = counts
+        self.rejected = rejected  # indexes of the input frames that failed to decode
+
+    def __len__(self) -> int:
+        return len(self.counts) // self.num_rows if self.num_rows else 0
+
+    def row(self, index: int) -> memoryview:
+        return memoryview(self.counts)[index * self.num_rows:(index + 1) * self.num_rows]
+
+    def tolists(self) -> List[List[int]]:
+        return [self.row(index).tolist() for index in range(len(self))]
+
+
+def decode_frames(frames: Iterable, num_rows: int, verify_checksum: bool = True) -> CountMatrix:
+    """Decodes a batch of frames into a CountMatrix; invalid frames are skipped and listed in `rejected`."""
+    counts = array("H")
+    rejected = []
+    for index, frame in enumerate(frames):
+        try:
+            _decode_into(counts, frame, num_rows, verify_checksum)
+        except FrameError:
+            rejected.append(index)
+    return CountMatrix(num_rows, _to_host_order(counts), rejected)
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+from .decoding import FrameError, decode_frame, xor_bytes
+
+ORION_BASE_DATE = datetime(2025, 4, 7)
+ORION_BASE_TIMESTAMP = 0x0467F3157F
+SECONDS_PER_DAY = 0x15180
+INIT_RESPONSE_SIZE = 67
+CONNECT_TIMEOUT = 5
+INIT_RESPONSE_TIMEOUT = 5
+COUNT_RESPONSE_TIMEOUT = 0.5
+FRAME_TERMINATOR = b"\r"
+READ_CHUNK_SIZE = 1024
+INIT_FRAME_CACHE_SIZE = 256  # covers every aviary for the few dates the API accepts
+
+
+def date_to_orion_hex(target_date_str: str) -> str:
+    delta_days = (date.fromisoformat(target_date_str) - ORION_BASE_DATE.date()).days
+    return f"{ORION_BASE_TIMESTAMP + delta_days * SECONDS_PER_DAY:X}"
+
+
+def xor_checksum(data: str) -> int:
+    return xor_bytes(data.encode("ascii"))
+
+
+def build_init_cmd(devcmd: str, date: str) -> str:
+    return init_frame(devcmd, date).decode("ascii")
+
+
+@lru_cache(maxsize=INIT_FRAME_CACHE_SIZE)
+def init_frame(devcmd: str, date: str) -> bytes:
+    """The encoded init command for a device and date, computed once per (devcmd, date)."""
+    cmd = f"{devcmd}{date_to_orion_hex(date)}"
+    return f"{cmd}{xor_checksum(cmd):02X}*\r".encode("ascii")
+
+
+class FrameBuffer:
+    """Accumulates received bytes and splits them into frames.
+
+    A frame ends at the carriage return terminator, or once `expected_size` bytes are buffered
+    for devices that leave the terminator for a later read. Line breaks left over from a previous
+    frame are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data) -> None:
+        self._buffer += data
+
+    def clear(self) -> None:
+        self._buffer.clear()
+
+    def next_frame(self, expected_size: int) -> Optional[bytes]:
+        start = 0
+        while start < len(self._buffer) and self._buffer[start] in b"\r\n":
+            start += 1
+        if start:
+            del self._buffer[:start]
+        end = self._buffer.find(FRAME_TERMINATOR, 0, expected_size + 1)
+        if end >= 0:
+            frame = bytes(self._buffer[:end])
+            del self._buffer[:end + 1]
+            return frame
+        if len(self._buffer) >= expected_size:
+            frame = bytes(self._buffer[:expected_size])
+            del self._buffer[:expected_size]
+            return frame
+        return None
+
+
+class StreamFrameReader:
+    """Reads whole frames from an asyncio StreamReader."""
+
+    def __init__(self, reader: asyncio.StreamReader):
+        self.reader = reader
+        self.buffer = FrameBuffer()
+
+    async def read_frame(self, expected_size: int, timeout: float) -> bytes:
+        return await asyncio.wait_for(self._read_frame(expected_size), timeout)
+
+    async def _read_frame(self, expected_size: int) -> bytes:
+        while True:
+            frame = self.buffer.next_frame(expected_size)
+            if frame is not None:
+                return frame
+            data = await self.reader.read(READ_CHUNK_SIZE)
+            if not data:
+                raise FrameError(f"Connection closed after {len(self.buffer)} bytes of a frame")
+            self.buffer.feed(data)
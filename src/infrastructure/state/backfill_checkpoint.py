@@ -0,0 +1,42 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Set, Tuple
+from src.domain.interfaces.backfill_checkpoint_repository import BackfillCheckpointRepository
+
+
+class SqliteBackfillCheckpoint(BackfillCheckpointRepository):
+    """Records which (aviary, date) pairs of a backfill run are done, so an interrupted run can resume."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS backfill_checkpoints ("
+            "run_id TEXT NOT NULL, aviary_id INTEGER NOT NULL, fecha TEXT NOT NULL, completed_at REAL NOT NULL, "
+            "PRIMARY KEY (run_id, aviary_id, fecha))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def completed(self, run_id: str) -> Set[Tuple[int, date]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT aviary_id, fecha FROM backfill_checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {(aviary_id, date.fromisoformat(fecha)) for aviary_id, fecha in rows}
+
+    def mark_done(self, run_id: str, aviary_id: int, count_date: date) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfill_checkpoints (run_id, aviary_id, fecha, completed_at) VALUES (?, ?, ?, ?)",
+                (run_id, aviary_id, count_date.isoformat(), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
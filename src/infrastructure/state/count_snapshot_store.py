@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Dict, Tuple
+from src.domain.interfaces.count_snapshot_repository import CountSnapshotRepository
+
+
+class SqliteCountSnapshotStore(CountSnapshotRepository):
+    """Last counts persisted to SQL Server per (aviary, date, fila), kept in a local SQLite file.
+
+    Snapshots for dates older than `retention_days` are pruned as newer dates are saved.
+    """
+
+    def __init__(self, path: str, retention_days: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.retention_days = retention_days
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS count_snapshots ("
+            "aviary_id INTEGER NOT NULL, fecha TEXT NOT NULL, fila INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (aviary_id, fecha, fila))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[int, date], Dict[int, int]] = {}
+        self.sent_writes = 0
+        self.skipped_writes = 0
+
+    def get_counts(self, aviary_id: int, count_date: date) -> Dict[int, int]:
+        key = (aviary_id, count_date)
+        with self._lock:
+            if key not in self._cache:
+                rows = self._conn.execute(
+                    "SELECT fila, count FROM count_snapshots WHERE aviary_id = ? AND fecha = ?",
+                    (aviary_id, count_date.isoformat())
+                ).fetchall()
+                self._cache[key] = dict(rows)
+            return dict(self._cache[key])
+
+    def save_counts(self, aviary_id: int, count_date: date, fila_counts: Dict[int, int]) -> None:
+        if not fila_counts:
+            return
+        fecha = count_date.isoformat()
+        oldest = (count_date - timedelta(days=self.retention_days - 1)).isoformat()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO count_snapshots (aviary_id, fecha, fila, count) VALUES (?, ?, ?, ?)",
+                    [(aviary_id, fecha, fila, count) for fila, count in fila_counts.items()]
+                )
+                self._conn.execute("DELETE FROM count_snapshots WHERE fecha < ?", (oldest,))
+            self._cache.setdefault((aviary_id, count_date), {}).update(fila_counts)
+            for key in [key for key in self._cache if key[1].isoformat() < oldest]:
+                del self._cache[key]
+
+    def record_writes(self, sent: int, skipped: int) -> None:
+        with self._lock:
+            self.sent_writes += sent
+            self.skipped_writes += skipped
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
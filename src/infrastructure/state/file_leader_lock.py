@@ -0,0 +1,58 @@
+import fcntl
+import logging
+import os
+from typing import Optional
+from src.domain.interfaces.leader_lock import LeaderLock
+
+logger = logging.getLogger(__name__)
+
+
+class FileLeaderLock(LeaderLock):
+    """flock() on a local file: for several workers or containers sharing one host or volume.
+
+    The kernel drops the lock when the holding process exits or crashes, so another process can
+    take over on its next attempt.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return self.is_held()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # The holder's pid, for whoever wonders which worker is collecting
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def is_held(self) -> bool:
+        if self._fd is None:
+            return False
+        # A lock file deleted or replaced behind our back no longer excludes anyone
+        try:
+            held = os.fstat(self._fd).st_ino == os.stat(self.path).st_ino
+        except OSError:
+            held = False
+        if not held:
+            self.release()
+        return held
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
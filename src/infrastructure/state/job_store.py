@@ -0,0 +1,81 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Optional
+from src.domain.entities.egg_count import EggCount
+from src.domain.entities.egg_count_job import EggCountJob
+from src.domain.entities.fila_mapping import shared_fila_mapping
+from src.domain.interfaces.egg_count_job_repository import EggCountJobRepository
+
+
+class SqliteEggCountJobStore(EggCountJobRepository):
+    """On-demand egg count jobs in a SQLite file, so every worker sharing the state directory can report them."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS egg_count_jobs ("
+            "id TEXT PRIMARY KEY, aviary_id INTEGER NOT NULL, fecha TEXT NOT NULL, status TEXT NOT NULL, "
+            "created_at TEXT NOT NULL, finished_at TEXT, counts TEXT, fila_mapping TEXT, persisted INTEGER, "
+            "error TEXT)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def save(self, job: EggCountJob) -> None:
+        result = job.result
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO egg_count_jobs "
+                "(id, aviary_id, fecha, status, created_at, finished_at, counts, fila_mapping, persisted, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.aviary_id, job.count_date.isoformat(), job.status, job.created_at.isoformat(),
+                 job.finished_at.isoformat() if job.finished_at else None,
+                 json.dumps(result.counts.tolist()) if result else None,
+                 json.dumps(dict(result.fila_mapping)) if result else None,
+                 int(result.persisted) if result else None,
+                 job.error)
+            )
+
+    def get(self, job_id: str) -> Optional[EggCountJob]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT aviary_id, fecha, status, created_at, finished_at, counts, fila_mapping, persisted, error "
+                "FROM egg_count_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        aviary_id, fecha, status, created_at, finished_at, counts, fila_mapping, persisted, error = row
+        count_date = date.fromisoformat(fecha)
+        result = None
+        if counts is not None:
+            mapping = shared_fila_mapping({int(index): fila for index, fila in json.loads(fila_mapping).items()})
+            result = EggCount(aviary_id, count_date, json.loads(counts), mapping, persisted=bool(persisted))
+        return EggCountJob(
+            id=job_id,
+            aviary_id=aviary_id,
+            count_date=count_date,
+            status=status,
+            created_at=datetime.fromisoformat(created_at),
+            finished_at=datetime.fromisoformat(finished_at) if finished_at else None,
+            result=result,
+            error=error,
+        )
+
+    def prune(self, max_finished: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM egg_count_jobs WHERE finished_at IS NOT NULL AND id NOT IN ("
+                "SELECT id FROM egg_count_jobs WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?)",
+                (max_finished,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
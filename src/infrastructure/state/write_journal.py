@@ -0,0 +1,168 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import List, Optional
+from src.domain.entities.pending_write import PendingWrite
+from src.domain.interfaces.write_journal_repository import WriteJournalRepository
+from src.infrastructure import metrics
+
+
+class SqliteWriteJournal(WriteJournalRepository):
+    """Durable queue of device reads that still have to reach SQL Server.
+
+    Counts are cumulative, so a newer read for an aviary/date replaces any older pending one, and a
+    successful write of a newer read drops the older ones (see `supersede`).
+    Failed entries are retried with jittered exponential backoff; rejected entries, and those still
+    unwritten after `max_attempts`, are moved to the failed_writes table for inspection.
+    `due` claims the entries it returns, so several workers can flush the same file without duplicate upserts;
+    a claim left by a crashed worker lapses after `claim_seconds`.
+    """
+
+    def __init__(self, path: str, backoff_base_seconds: float, backoff_max_seconds: float, max_attempts: int = 20,
+                 claim_seconds: float = 300):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.max_attempts = max_attempts
+        self.claim_seconds = claim_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_writes ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, aviary_id INTEGER NOT NULL, fecha TEXT NOT NULL, "
+            "counts TEXT NOT NULL, fila_mapping TEXT NOT NULL, created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failed_writes ("
+            "id INTEGER PRIMARY KEY, aviary_id INTEGER NOT NULL, fecha TEXT NOT NULL, "
+            "counts TEXT NOT NULL, fila_mapping TEXT NOT NULL, created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL, failed_at REAL NOT NULL, reason TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def append(self, aviary_id: int, count_date: date, counts: List[int], fila_mapping: dict,
+               read_at: Optional[float] = None) -> int:
+        """Queues a read taken at `read_at` (default now); returns its id, or that of a newer pending read it lost to."""
+        now = time.time()
+        read_at = now if read_at is None else read_at
+        with self._lock, self._conn:
+            newer = self._conn.execute(
+                "SELECT id FROM pending_writes WHERE aviary_id = ? AND fecha = ? AND created_at > ?",
+                (aviary_id, count_date.isoformat(), read_at)
+            ).fetchone()
+            if newer is not None:
+                return newer[0]
+            self._conn.execute(
+                "DELETE FROM pending_writes WHERE aviary_id = ? AND fecha = ?",
+                (aviary_id, count_date.isoformat())
+            )
+            cursor = self._conn.execute(
+                "INSERT INTO pending_writes (aviary_id, fecha, counts, fila_mapping, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (aviary_id, count_date.isoformat(), json.dumps(list(counts)), json.dumps(dict(fila_mapping)),
+                 read_at, now + self.backoff_base_seconds)
+            )
+            return cursor.lastrowid
+
+    def due(self, limit: int) -> List[PendingWrite]:
+        """Claims up to `limit` due entries for `claim_seconds`, so flushers sharing the file never take the same one."""
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock before the SELECT, making select-and-claim atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, aviary_id, fecha, counts, fila_mapping, attempts, created_at FROM pending_writes "
+                    "WHERE next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE pending_writes SET next_attempt_at = ? WHERE id = ?",
+                    [(now + self.claim_seconds, row[0]) for row in rows]
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return [
+            PendingWrite(
+                id=entry_id,
+                aviary_id=aviary_id,
+                date=date.fromisoformat(fecha),
+                counts=json.loads(counts),
+                fila_mapping={int(index): fila for index, fila in json.loads(fila_mapping).items()},
+                attempts=attempts,
+                created_at=created_at,
+            )
+            for entry_id, aviary_id, fecha, counts, fila_mapping, attempts, created_at in rows
+        ]
+
+    def remove(self, entry_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_writes WHERE id = ?", (entry_id,))
+
+    def is_pending(self, entry_id: int) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pending_writes WHERE id = ?", (entry_id,)).fetchone() is not None
+
+    def supersede(self, aviary_id: int, count_date: date, read_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM pending_writes WHERE aviary_id = ? AND fecha = ? AND created_at <= ?",
+                (aviary_id, count_date.isoformat(), read_at)
+            )
+
+    def reschedule(self, entry_id: int, reason: str = "") -> bool:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts, aviary_id FROM pending_writes WHERE id = ?", (entry_id,)).fetchone()
+            if row is None:
+                return True
+            attempts = row[0] + 1
+            if attempts >= self.max_attempts:
+                self._move_to_failed(entry_id, reason or f"not written after {attempts} attempts")
+                metrics.count(metrics.JOURNAL_FAILED_WRITES, row[1])
+                return False
+            delay = min(self.backoff_base_seconds * 2 ** attempts, self.backoff_max_seconds)
+            self._conn.execute(
+                "UPDATE pending_writes SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                (attempts, time.time() + delay * random.uniform(0.5, 1.0), entry_id)
+            )
+            return True
+
+    def fail(self, entry_id: int, reason: str) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT aviary_id FROM pending_writes WHERE id = ?", (entry_id,)).fetchone()
+            if row is None:
+                return
+            self._move_to_failed(entry_id, reason)
+        metrics.count(metrics.JOURNAL_FAILED_WRITES, row[0])
+
+    def _move_to_failed(self, entry_id: int, reason: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO failed_writes "
+            "(id, aviary_id, fecha, counts, fila_mapping, created_at, attempts, failed_at, reason) "
+            "SELECT id, aviary_id, fecha, counts, fila_mapping, created_at, attempts + 1, ?, ? "
+            "FROM pending_writes WHERE id = ?",
+            (time.time(), reason, entry_id)
+        )
+        self._conn.execute("DELETE FROM pending_writes WHERE id = ?", (entry_id,))
+
+    def failed_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM failed_writes").fetchone()[0]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_writes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
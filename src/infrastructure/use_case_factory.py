@@ -0,0 +1,114 @@
+from typing import Callable, List, Optional
+from src.application.recent_counts_cache import RecentCountsCache
+from src.application.services.backfill import BackfillService, BackfillTarget
+from src.application.services.count_writer import CountWriter
+from src.application.services.egg_count_query import EggCountQueryService
+from src.application.services.journal_flusher import JournalFlusher
+from src.application.single_flight import SingleFlight
+from src.application.use_cases.process_egg_counts import ProcessEggCountsUseCase
+from src.config.settings import (
+    BACKFILL_SETTINGS,
+    COORDINATION_SETTINGS,
+    JOURNAL_FLUSHER_SETTINGS,
+    QUERY_SETTINGS,
+    SINGLE_FLIGHT_SETTINGS,
+    STATE_SETTINGS,
+)
+from src.infrastructure.aviary_registry import aviary_registry
+from src.domain.interfaces.database_repository import DatabaseRepository
+from src.domain.interfaces.leader_lock import LeaderLock
+from src.infrastructure.database.sql_server_repository import SqlServerRepository
+from src.infrastructure.state.backfill_checkpoint import SqliteBackfillCheckpoint
+from src.infrastructure.state.count_snapshot_store import SqliteCountSnapshotStore
+from src.infrastructure.state.job_store import SqliteEggCountJobStore
+from src.infrastructure.state.write_journal import SqliteWriteJournal
+
+_database_repository_factory: Callable[[], DatabaseRepository] = SqlServerRepository
+
+def configure_database_repository(factory: Callable[[], DatabaseRepository]):
+    """Replaces the repository used for writes, e.g. with a stand-in database for benchmarks."""
+    global _database_repository_factory
+    _database_repository_factory = factory
+
+def build_database_repository() -> DatabaseRepository:
+    return _database_repository_factory()
+
+egg_count_flights = SingleFlight(result_ttl_seconds=SINGLE_FLIGHT_SETTINGS["result_ttl_seconds"])
+count_snapshots = SqliteCountSnapshotStore(
+    STATE_SETTINGS["count_snapshot_path"],
+    retention_days=STATE_SETTINGS["count_snapshot_retention_days"],
+) if STATE_SETTINGS["change_detection"] else None
+write_journal = SqliteWriteJournal(
+    STATE_SETTINGS["write_journal_path"],
+    backoff_base_seconds=JOURNAL_FLUSHER_SETTINGS["backoff_base_seconds"],
+    backoff_max_seconds=JOURNAL_FLUSHER_SETTINGS["backoff_max_seconds"],
+    max_attempts=JOURNAL_FLUSHER_SETTINGS["max_attempts"],
+    claim_seconds=JOURNAL_FLUSHER_SETTINGS["claim_seconds"],
+) if STATE_SETTINGS["write_journal_enabled"] else None
+egg_count_job_store = SqliteEggCountJobStore(STATE_SETTINGS["job_store_path"])
+recent_counts = RecentCountsCache(
+    retention_days=QUERY_SETTINGS["cache_retention_days"],
+    max_entries=QUERY_SETTINGS["cache_max_entries"],
+    negative_ttl_seconds=QUERY_SETTINGS["cache_negative_ttl_seconds"],
+    recent_ttl_seconds=QUERY_SETTINGS["cache_recent_ttl_seconds"],
+)
+
+def build_journal_flusher() -> Optional[JournalFlusher]:
+    if write_journal is None:
+        return None
+    return JournalFlusher(
+        write_journal,
+        CountWriter(build_database_repository(), count_snapshots, recent_counts),
+        interval_seconds=JOURNAL_FLUSHER_SETTINGS["interval_seconds"],
+        batch_size=JOURNAL_FLUSHER_SETTINGS["batch_size"],
+    )
+
+def build_backfill_service() -> BackfillService:
+    return BackfillService(
+        SqliteBackfillCheckpoint(BACKFILL_SETTINGS["checkpoint_path"]),
+        CountWriter(build_database_repository(), count_snapshots, recent_counts),
+        write_journal,
+        min_interval_seconds=BACKFILL_SETTINGS["min_interval_seconds"],
+    )
+
+def build_backfill_targets(aviary_ids: List[int]) -> List[BackfillTarget]:
+    targets = []
+    for aviary_id in aviary_ids:
+        entry = aviary_registry[aviary_id]
+        targets.append(BackfillTarget(
+            aviary_id=aviary_id,
+            controller=f"{entry.config.ip}:{entry.config.port}",
+            orion_repo=entry.client,
+            fila_mapping=entry.fila_mapping,
+        ))
+    return targets
+
+def build_process_egg_counts_use_case(aviary_id: int, db_repo: Optional[DatabaseRepository] = None) -> ProcessEggCountsUseCase:
+    # The Orion client and fila mapping are the long-lived ones held by the aviary registry
+    entry = aviary_registry[aviary_id]
+    return ProcessEggCountsUseCase(
+        orion_repo=entry.client,
+        db_repo=db_repo or build_database_repository(),
+        fila_mapping=entry.fila_mapping,
+        flights=egg_count_flights,
+        snapshots=count_snapshots,
+        journal=write_journal,
+        recent_counts=recent_counts
+    )
+
+def build_egg_count_query_service() -> EggCountQueryService:
+    return EggCountQueryService(recent_counts, build_database_repository())
+
+def build_leader_lock() -> Optional[LeaderLock]:
+    """The lock that elects the one process running scheduled collection, or None when every process runs it."""
+    mode = COORDINATION_SETTINGS["mode"]
+    if mode == "none":
+        return None
+    if mode == "file":
+        # fcntl is POSIX-only, so it is imported only when asked for
+        from src.infrastructure.state.file_leader_lock import FileLeaderLock
+        return FileLeaderLock(COORDINATION_SETTINGS["lock_path"])
+    if mode == "sql":
+        from src.infrastructure.database.sql_leader_lock import SqlServerLeaderLock
+        return SqlServerLeaderLock(COORDINATION_SETTINGS["lock_resource"])
+    raise ValueError(f"Unknown SCHEDULER_COORDINATION: {mode!r} (expected none, file or sql)")
@@ -1,8 +1,25 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, List, Optional, Union
 from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
+
+def validate_recent_date(value: str) -> str:
+    try:
+        input_date = datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Date must be in YYYY-MM-DD format")
+
+    # Get current date in Asunción timezone (PYT, UTC-3 in April 2025)
+    today = datetime.now(ZoneInfo("America/Asuncion")).date()
+    # Define valid dates: today, yesterday, day before yesterday
+    valid_dates = {today, today - timedelta(days=1), today - timedelta(days=2)}
+
+    if input_date not in valid_dates:
+        raise ValueError("La fecha debe ser la de hoy,ayer o anteayer")
+    return value
+
+
 class EggCountRequest(BaseModel):
     aviary_id: int
     date: str
@@ -10,22 +27,85 @@ class EggCountRequest(BaseModel):
     @field_validator("date")
     @classmethod
     def validate_date(cls, value: str) -> str:
-        try:
-            input_date = datetime.strptime(value, "%Y-%m-%d").date()
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
+        return validate_recent_date(value)
 
-        # Get current date in Asunción timezone (PYT, UTC-3 in April 2025)
-        today = datetime.now(ZoneInfo("America/Asuncion")).date()
-        # Define valid dates: today, yesterday, day before yesterday
-        valid_dates = {today, today - timedelta(days=1), today - timedelta(days=2)}
+class EggCountData(BaseModel):
+    aviary_id: int
+    date: str
+    egg_counts: List[int]
 
-        if input_date not in valid_dates:
-            raise ValueError("La fecha debe ser la de hoy,ayer o anteayer")
-        return value
+class EggCountAccepted(BaseModel):
+    job_id: str
+    status: str
 
 class EggCountResponse(BaseModel):
     status: str
     message: str
-    data: Optional[dict] = None  
+    data: Optional[Union[EggCountData, EggCountAccepted]] = None
+
+class EggCountBatchRequest(BaseModel):
+    aviary_ids: List[int] = Field(min_length=1)
+    dates: List[str] = Field(min_length=1, max_length=3)
+
+    @field_validator("dates")
+    @classmethod
+    def validate_dates(cls, values: List[str]) -> List[str]:
+        return sorted({validate_recent_date(value) for value in values})
+
+    @field_validator("aviary_ids")
+    @classmethod
+    def unique_aviary_ids(cls, values: List[int]) -> List[int]:
+        return list(dict.fromkeys(values))
+
+class EggCountBatchItem(BaseModel):
+    aviary_id: int
+    date: str
+    status: str
+    message: str
+    egg_counts: Optional[List[int]] = None
+
+class EggCountBatchResponse(BaseModel):
+    status: str
+    message: str
+    results: List[EggCountBatchItem]
+
+class EggCountJobResponse(BaseModel):
+    job_id: str
+    status: str
+    aviary_id: int
+    date: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    message: Optional[str] = None
+    egg_counts: Optional[List[int]] = None
+
+class StoredEggCountDay(BaseModel):
+    date: str
+    total: int
+    filas: Dict[int, int]
+
+class StoredEggCountsResponse(BaseModel):
+    aviary_id: int
+    start: str
+    end: str
+    days: List[StoredEggCountDay]
+
+class BlockDailyTotal(BaseModel):
+    date: str
+    total: int
+    aviaries: Dict[int, int]
+    missing_aviaries: List[int]
+
+class BlockDailyTotalsResponse(BaseModel):
+    block: str
+    start: str
+    end: str
+    days: List[BlockDailyTotal]
 
+class AviaryReloadResponse(BaseModel):
+    aviaries: int
+    working_aviaries: List[int]
+    added: List[int]
+    removed: List[int]
+    changed: List[int]
+    closed_controllers: List[str]
@@ -1,15 +1,55 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
-from src.application.use_cases.process_egg_counts import ProcessEggCountsUseCase
-from src.presentation.api.v1.models.egg_count import EggCountRequest, EggCountResponse
-from src.config.settings import AVIARY_CONFIGS
-from src.infrastructure.orion.client import OrionClient
-from src.infrastructure.database.sql_server_repository import SqlServerRepository
+import asyncio
+import hmac
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional, Tuple
+from src.presentation.api.v1.models.egg_count import (
+    AviaryReloadResponse,
+    BlockDailyTotal,
+    BlockDailyTotalsResponse,
+    EggCountAccepted,
+    EggCountBatchItem,
+    EggCountBatchRequest,
+    EggCountBatchResponse,
+    EggCountData,
+    EggCountJobResponse,
+    EggCountRequest,
+    EggCountResponse,
+    StoredEggCountDay,
+    StoredEggCountsResponse,
+)
+from src.presentation.api.v1.responses import json_response
+from src.application.services.egg_count_query import StoredCountsUnavailable
+from src.config.settings import API_SETTINGS, AVIARY_SOURCE_SETTINGS, DATABASE_SETTINGS, QUERY_SETTINGS
+from src.domain.interfaces.database_repository import DatabaseRepository
+from src.infrastructure import metrics
+from src.infrastructure.aviary_registry import aviary_registry
+from src.infrastructure.use_case_factory import (
+    build_database_repository,
+    build_egg_count_query_service,
+    build_process_egg_counts_use_case,
+)
+from src.scheduler.controller_limiter import ControllerLimiter
+from src.domain.entities.egg_count_job import EggCountJob
 
 router = APIRouter()
 
+def _job_response(job: EggCountJob) -> EggCountJobResponse:
+    return EggCountJobResponse(
+        job_id=job.id,
+        status=job.status,
+        aviary_id=job.aviary_id,
+        date=job.count_date.strftime("%Y-%m-%d"),
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        message=job.error,
+        egg_counts=job.result.counts.tolist() if job.result else None
+    )
+
 @router.post("/egg_counts", response_model=EggCountResponse)
-async def process_egg_counts(request: EggCountRequest):
+async def process_egg_counts(request: EggCountRequest, http_request: Request, response: Response,
+                             mode: Literal["sync", "async"] = "sync"):
     aviary_id = request.aviary_id
     #date = request.date
     try:
@@ -19,35 +59,188 @@ async def process_egg_counts(request: EggCountRequest):
         # Shouldn't reach here due to Pydantic validation, but included for safety
         raise HTTPException(status_code=400, detail="Invalid date format")
 
-    if aviary_id not in AVIARY_CONFIGS:
+    if aviary_id not in aviary_registry:
         raise HTTPException(status_code=400, detail=f"Invalid aviary_id: {aviary_id}")
-    config = AVIARY_CONFIGS[aviary_id]
-    orion_client = OrionClient(
-        ip=config.ip,
-        port=config.port,
-        devcmd=config.devcmd,
-        num_rows=config.num_rows,
-        target_cmd=config.target_cmd,
-        response_size=config.response_size
-    )
-    db_repo = SqlServerRepository()
-    use_case = ProcessEggCountsUseCase(
-        orion_repo=orion_client,
-        db_repo=db_repo,
-        fila_mapping=config.fila_mapping
-    )
+
+    if mode == "async":
+        # Enqueue on the scheduler's job manager and answer right away with the job id
+        job, created = http_request.app.state.scheduler.jobs.submit(aviary_id, date_obj)
+        response.status_code = 202
+        return EggCountResponse(
+            status="accepted",
+            message="Egg count job queued" if created else "Egg count job already in progress",
+            data=EggCountAccepted(job_id=job.id, status=job.status)
+        )
+
+    use_case = build_process_egg_counts_use_case(aviary_id)
     try:
-        result = use_case.execute(aviary_id, date_obj)
+        with metrics.observe(metrics.AVIARY_SECONDS, aviary_id):
+            result = await use_case.execute_async(aviary_id, date_obj)
         if not result:
             raise ValueError("Failed to process egg counts")
         return EggCountResponse(
             status="success",
-            message="Egg counts updated successfully",
-            data={
-                "aviary_id": result.aviary_id,
-                "date": result.date.strftime("%Y-%m-%d"),
-                "egg_counts": result.counts
-            }
+            message="Egg counts updated successfully" if result.persisted else "Egg counts read; database write queued",
+            data=EggCountData(
+                aviary_id=result.aviary_id,
+                date=result.date.strftime("%Y-%m-%d"),
+                egg_counts=result.counts.tolist()
+            )
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing egg counts: {str(e)}")
+
+@router.get("/egg_counts/jobs/{job_id}", response_model=EggCountJobResponse)
+async def get_egg_count_job(job_id: str, http_request: Request):
+    job = http_request.app.state.scheduler.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return json_response(_job_response(job))
+
+async def _process_batch_item(aviary_id: int, date_obj: date, db_repo: DatabaseRepository,
+                              semaphore: asyncio.Semaphore, limiter: ControllerLimiter) -> EggCountBatchItem:
+    date_str = date_obj.strftime("%Y-%m-%d")
+    if aviary_id not in aviary_registry:
+        return EggCountBatchItem(aviary_id=aviary_id, date=date_str, status="error",
+                                 message=f"Invalid aviary_id: {aviary_id}")
+    try:
+        async with semaphore, limiter.for_ip(aviary_registry.configs[aviary_id].ip):
+            with metrics.observe(metrics.AVIARY_SECONDS, aviary_id):
+                result = await build_process_egg_counts_use_case(aviary_id, db_repo).execute_async(aviary_id, date_obj)
+        if not result:
+            return EggCountBatchItem(aviary_id=aviary_id, date=date_str, status="error",
+                                     message="Failed to process egg counts")
+        message = "Egg counts updated successfully" if result.persisted else "Egg counts read; database write queued"
+        return EggCountBatchItem(aviary_id=aviary_id, date=date_str, status="success",
+                                 message=message, egg_counts=result.counts.tolist())
+    except Exception as e:
+        return EggCountBatchItem(aviary_id=aviary_id, date=date_str, status="error",
+                                 message=f"Error processing egg counts: {str(e)}")
+
+@router.post("/egg_counts/batch", response_model=EggCountBatchResponse)
+async def process_egg_counts_batch(request: EggCountBatchRequest, http_request: Request, stream: bool = False):
+    """Processes every aviary/date combination concurrently; `stream=true` returns NDJSON lines as items finish."""
+    db_repo = build_database_repository()
+    semaphore = asyncio.Semaphore(API_SETTINGS["batch_concurrency"])
+    # Shared with the scheduler and single-aviary jobs, so concurrent batches cannot exceed the per-controller limit
+    limiter = http_request.app.state.scheduler.limiter
+    tasks = [
+        asyncio.ensure_future(_process_batch_item(
+            aviary_id, datetime.strptime(date_str, "%Y-%m-%d").date(), db_repo, semaphore, limiter
+        ))
+        for date_str in request.dates
+        for aviary_id in request.aviary_ids
+    ]
+
+    if stream:
+        async def ndjson_lines():
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    item = await next_done
+                    yield item.model_dump_json() + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    results = await asyncio.gather(*tasks)
+    successes = sum(1 for item in results if item.status == "success")
+    return json_response(EggCountBatchResponse(
+        status="success" if successes == len(results) else "partial" if successes else "error",
+        message=f"{successes}/{len(results)} egg counts updated successfully",
+        results=results
+    ))
+
+def _parse_range(start: str, end: Optional[str]) -> Tuple[date, date]:
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else start_date
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end_date - start_date).days + 1 > QUERY_SETTINGS["max_range_days"]:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {QUERY_SETTINGS['max_range_days']} days")
+    return start_date, end_date
+
+def _require_query_source():
+    if not DATABASE_SETTINGS["egg_counts_table"]:
+        raise HTTPException(status_code=404, detail="Stored count queries are disabled; set DATABASE_EGG_COUNTS_TABLE")
+
+async def _stored_counts(aviary_ids: List[int], start_date: date, end_date: date):
+    try:
+        return await build_egg_count_query_service().get_counts(aviary_ids, start_date, end_date)
+    except StoredCountsUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/egg_counts/blocks/{block}/totals", response_model=BlockDailyTotalsResponse)
+async def get_block_daily_totals(block: str, start: str, end: Optional[str] = None):
+    """Daily egg totals of every aviary in a block; aviaries with nothing stored for a day are listed as missing."""
+    _require_query_source()
+    aviary_ids = aviary_registry.block_aviaries(block)
+    if not aviary_ids:
+        raise HTTPException(status_code=404, detail=f"Unknown block: {block}")
+    start_date, end_date = _parse_range(start, end)
+    stored = await _stored_counts(aviary_ids, start_date, end_date)
+
+    days = []
+    for offset in range((end_date - start_date).days + 1):
+        count_date = start_date + timedelta(days=offset)
+        totals = {}
+        missing = []
+        for aviary_id in aviary_ids:
+            egg_count = stored.get((aviary_id, count_date))
+            if egg_count:
+                totals[aviary_id] = egg_count.total()
+            else:
+                missing.append(aviary_id)
+        days.append(BlockDailyTotal(date=count_date.strftime("%Y-%m-%d"), total=sum(totals.values()),
+                                    aviaries=totals, missing_aviaries=missing))
+    return json_response(BlockDailyTotalsResponse(block=block, start=start_date.strftime("%Y-%m-%d"),
+                                                  end=end_date.strftime("%Y-%m-%d"), days=days))
+
+@router.get("/egg_counts/{aviary_id}", response_model=StoredEggCountsResponse)
+async def get_stored_egg_counts(aviary_id: int, start: str, end: Optional[str] = None,
+                                fila_from: Optional[int] = None, fila_to: Optional[int] = None):
+    """Stored counts of an aviary per day, optionally limited to filas `fila_from`..`fila_to`; days with nothing stored are omitted."""
+    _require_query_source()
+    if aviary_id not in aviary_registry:
+        raise HTTPException(status_code=400, detail=f"Invalid aviary_id: {aviary_id}")
+    start_date, end_date = _parse_range(start, end)
+    stored = await _stored_counts([aviary_id], start_date, end_date)
+
+    days = []
+    for offset in range((end_date - start_date).days + 1):
+        count_date = start_date + timedelta(days=offset)
+        egg_count = stored.get((aviary_id, count_date))
+        if not egg_count:
+            continue
+        selected = {
+            fila: count for fila, count in sorted(egg_count.filas().items())
+            if (fila_from is None or fila >= fila_from) and (fila_to is None or fila <= fila_to)
+        }
+        days.append(StoredEggCountDay(date=count_date.strftime("%Y-%m-%d"), total=sum(selected.values()),
+                                      filas=selected))
+    return json_response(StoredEggCountsResponse(aviary_id=aviary_id, start=start_date.strftime("%Y-%m-%d"),
+                                                 end=end_date.strftime("%Y-%m-%d"), days=days))
+
+@router.post("/admin/aviaries/reload", response_model=AviaryReloadResponse)
+async def reload_aviaries(x_admin_token: Optional[str] = Header(default=None)):
+    """Re-reads the aviary config and swaps the registry; the scheduler uses it from its next cycle."""
+    admin_token = AVIARY_SOURCE_SETTINGS["admin_token"]
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    try:
+        report = aviary_registry.load()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Aviary config not reloaded: {str(e)}")
+    return AviaryReloadResponse(
+        aviaries=len(aviary_registry.configs),
+        working_aviaries=report.working_aviaries,
+        added=report.added,
+        removed=report.removed,
+        changed=report.changed,
+        closed_controllers=report.closed_controllers
+    )
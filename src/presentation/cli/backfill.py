@@ -0,0 +1,63 @@
+"""Backfill egg counts for a date range.
+
+    python -m src.presentation.cli.backfill --start 2025-06-01 --end 2025-06-05 [--aviaries 15,16] [--run-id outage-june]
+
+Re-running with the same --run-id skips the aviary/date pairs that already finished.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from src.config.logging import setup_logging
+from src.infrastructure.aviary_registry import aviary_registry
+from src.infrastructure.orion.connection_pool import orion_pool
+from src.infrastructure.database.connection import db_pool
+from src.infrastructure.use_case_factory import build_backfill_service, build_backfill_targets
+
+logger = logging.getLogger(__name__)
+
+def _parse_date(value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("Date must be in YYYY-MM-DD format")
+
+def _parse_aviaries(value: str):
+    try:
+        return [int(aviary_id) for aviary_id in value.split(",") if aviary_id.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Aviaries must be a comma-separated list of ids")
+
+async def _run(args) -> int:
+    aviary_registry.load()
+    aviary_ids = args.aviaries or sorted(aviary_registry.configs)
+    unknown = [aviary_id for aviary_id in aviary_ids if aviary_id not in aviary_registry]
+    if unknown:
+        logger.error(f"Invalid aviary ids: {unknown}")
+        return 2
+    run_id = args.run_id or f"backfill-{args.start}-{args.end}"
+    try:
+        report = await build_backfill_service().run(run_id, build_backfill_targets(aviary_ids), args.start, args.end)
+    finally:
+        orion_pool.close_all()
+        db_pool.close_all()
+    if report.failed:
+        logger.error(f"Failed pairs (re-run with --run-id {run_id} to retry): {report.failed}")
+        return 1
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill egg counts for a date range")
+    parser.add_argument("--start", type=_parse_date, required=True, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=_parse_date, required=True, help="last date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--aviaries", type=_parse_aviaries, help="comma-separated aviary ids (default: all configured)")
+    parser.add_argument("--run-id", help="checkpoint name used to resume (default: derived from the dates)")
+    args = parser.parse_args(argv)
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+    setup_logging()
+    return asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import asyncio
+from typing import Dict
+
+
+class ControllerLimiter:
+    """Caps how many aviaries are in flight against the same controller IP."""
+
+    def __init__(self, per_controller_limit: int):
+        self.per_controller_limit = max(1, per_controller_limit)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def for_ip(self, ip: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(ip)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_controller_limit)
+            self._semaphores[ip] = semaphore
+        return semaphore
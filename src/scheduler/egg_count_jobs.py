@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+from src.domain.entities.egg_count_job import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    EggCountJob,
+)
+from src.domain.interfaces.egg_count_job_repository import EggCountJobRepository
+from src.infrastructure.aviary_registry import aviary_registry
+from src.infrastructure.use_case_factory import build_process_egg_counts_use_case
+from src.scheduler.controller_limiter import ControllerLimiter
+
+logger = logging.getLogger(__name__)
+
+class EggCountJobManager:
+    """Runs on-demand egg count jobs in the background on the scheduler's executor and controller limits.
+
+    A submit for an aviary/date that is already queued or running in this process returns the existing job.
+    With a `store`, every state change is also saved there, so a job can be looked up from any worker.
+    """
+
+    def __init__(self, executor: Executor, limiter: ControllerLimiter, max_finished_jobs: int,
+                 store: Optional[EggCountJobRepository] = None):
+        self.executor = executor
+        self.limiter = limiter
+        self.max_finished_jobs = max_finished_jobs
+        self.store = store
+        self._jobs: "OrderedDict[str, EggCountJob]" = OrderedDict()
+        self._in_flight: Dict[Tuple[int, date], str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, aviary_id: int, count_date: date) -> Tuple[EggCountJob, bool]:
+        """Returns the job for the aviary/date and whether a new one was created."""
+        key = (aviary_id, count_date)
+        job_id = self._in_flight.get(key)
+        if job_id is not None:
+            return self._jobs[job_id], False
+
+        job = EggCountJob(
+            id=uuid.uuid4().hex,
+            aviary_id=aviary_id,
+            count_date=count_date,
+            status=JOB_QUEUED,
+            created_at=datetime.now(ZoneInfo('America/Argentina/Buenos_Aires')),
+        )
+        self._jobs[job.id] = job
+        self._in_flight[key] = job.id
+        self._save(job)
+        self._tasks[job.id] = asyncio.ensure_future(self._run(job))
+        self._evict_finished()
+        return job, True
+
+    def get(self, job_id: str) -> Optional[EggCountJob]:
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            # Submitted to another worker
+            job = self.store.get(job_id)
+        return job
+
+    def cancel_all(self):
+        for task in self._tasks.values():
+            task.cancel()
+
+    async def _run(self, job: EggCountJob):
+        try:
+            config = aviary_registry.configs[job.aviary_id]
+            async with self.limiter.for_ip(config.ip):
+                job.status = JOB_RUNNING
+                self._save(job)
+                use_case = build_process_egg_counts_use_case(job.aviary_id)
+                job.result = await use_case.execute_async(job.aviary_id, job.count_date, self.executor)
+            if job.result:
+                job.status = JOB_SUCCEEDED
+                if not job.result.persisted:
+                    job.error = "Egg counts read; database write queued"
+            else:
+                job.status = JOB_FAILED
+                job.error = "Failed to process egg counts"
+        except Exception as e:
+            logger.error(f"Job {job.id} for aviary {job.aviary_id} error: {str(e)}")
+            job.status = JOB_FAILED
+            job.error = f"Error processing egg counts: {str(e)}"
+        finally:
+            if job.status in (JOB_QUEUED, JOB_RUNNING):
+                job.status = JOB_FAILED
+                job.error = "Job cancelled"
+            job.finished_at = datetime.now(ZoneInfo('America/Argentina/Buenos_Aires'))
+            self._in_flight.pop((job.aviary_id, job.count_date), None)
+            self._tasks.pop(job.id, None)
+            self._save(job)
+
+    def _save(self, job: EggCountJob):
+        if self.store is None:
+            return
+        try:
+            self.store.save(job)
+        except Exception as e:
+            logger.error(f"Job {job.id} could not be saved to the job store: {str(e)}")
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+        if self.store is not None:
+            try:
+                self.store.prune(self.max_finished_jobs)
+            except Exception as e:
+                logger.error(f"Job store could not be pruned: {str(e)}")
@@ -1,119 +1,288 @@
 import logging
 from zoneinfo import ZoneInfo
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
-from typing import List
-from src.application.use_cases.process_egg_counts import ProcessEggCountsUseCase
-from src.config.settings import AVIARY_CONFIGS
-from src.infrastructure.orion.client import OrionClient
-from src.infrastructure.database.sql_server_repository import SqlServerRepository
+from typing import Dict, List, Optional, Set, Tuple
+from src.config.settings import SCHEDULER_SETTINGS
+from src.domain.interfaces.database_repository import WriteRejected
+from src.infrastructure import metrics
+from src.infrastructure.aviary_registry import aviary_registry
+from src.infrastructure.database.sql_server_repository import lote_cache
+from src.infrastructure.orion.connection_pool import orion_pool
+from src.infrastructure.orion.controller_health import controller_health
+from src.infrastructure.use_case_factory import (
+    build_database_repository,
+    build_process_egg_counts_use_case,
+    count_snapshots,
+    egg_count_flights,
+    egg_count_job_store,
+    write_journal,
+)
+from src.scheduler.controller_limiter import ControllerLimiter
+from src.scheduler.egg_count_jobs import EggCountJobManager
 import asyncio
+import random
+import time
 import traceback
 
 logger = logging.getLogger(__name__)
 
+def _aviary_name(aviary_id: int) -> str:
+    # An aviary removed by a registry reload mid-cycle has no config any more
+    config = aviary_registry.configs.get(aviary_id)
+    return config.name if config else "removed"
+
 class EggCountScheduler:
     def __init__(self):
         self.scheduler = AsyncIOScheduler(timezone=ZoneInfo('America/Argentina/Buenos_Aires'))
-        self.executor = ThreadPoolExecutor(max_workers=1)
-        self.working_aviaries = [15, 16, 17, 18, 19, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 38]
-        missing = [avid for avid in self.working_aviaries if avid not in AVIARY_CONFIGS]
-        if missing:
-            logger.error(f"Missing configs for aviaries: {missing}")
+        self.executor = ThreadPoolExecutor(max_workers=SCHEDULER_SETTINGS["max_workers"])
+        self.limiter = ControllerLimiter(SCHEDULER_SETTINGS["per_controller_limit"])
+        self.job_deadline_seconds = SCHEDULER_SETTINGS["job_deadline_seconds"]
+        self.retry_backoff_base_seconds = SCHEDULER_SETTINGS["retry_backoff_base_seconds"]
+        self.retry_backoff_max_seconds = SCHEDULER_SETTINGS["retry_backoff_max_seconds"]
+        self.lote_prefetch_timeout_seconds = SCHEDULER_SETTINGS["lote_prefetch_timeout_seconds"]
+        self.jobs = EggCountJobManager(self.executor, self.limiter, SCHEDULER_SETTINGS["max_finished_jobs"],
+                                       store=egg_count_job_store)
+        self.mode = SCHEDULER_SETTINGS["mode"]
+        self.stagger_window_seconds = SCHEDULER_SETTINGS["stagger_window_seconds"]
+        self.day_end_run_lead_seconds = SCHEDULER_SETTINGS["day_end_run_lead_seconds"]
+        # Aviaries that still failed after the retries of the last cycle go first in the next one
+        self.last_failed: Set[int] = set()
+        # Aviaries of the current cycle read successfully but whose write is still queued in the journal
+        self.pending_writes: Set[int] = set()
+        # Held for the length of a cycle, so the day-end run never overlaps a staggered one (created on the loop)
+        self._cycle_lock: Optional[asyncio.Lock] = None
+        if self.mode == "staggered" and not 0 < self.job_deadline_seconds < 59 * 60:
+            # The staggered cycle has to start and end within the hour before HH:59:00
+            raise ValueError(f"SCHEDULER_JOB_DEADLINE_SECONDS must be between 0 and {59 * 60} in staggered mode, "
+                             f"got {self.job_deadline_seconds:.0f}")
 
-    def process_aviary(self, aviary_id: int, date: date) -> bool:
+    async def process_aviary(self, aviary_id: int, date: date) -> bool:
+        config = aviary_registry.configs[aviary_id]
         try:
-            config = AVIARY_CONFIGS[aviary_id]
-            orion_client = OrionClient(
-                ip=config.ip,
-                port=config.port,
-                devcmd=config.devcmd,
-                num_rows=config.num_rows,
-                target_cmd=config.target_cmd,
-                response_size=config.response_size
-            )
-            db_repo = SqlServerRepository()
-            use_case = ProcessEggCountsUseCase(
-                orion_repo=orion_client,
-                db_repo=db_repo,
-                fila_mapping=config.fila_mapping
-            )
+            use_case = build_process_egg_counts_use_case(aviary_id)
             logger.debug(f"Executing for aviary {aviary_id} with date: {date} (type: {type(date)})")
-            result = use_case.execute(aviary_id, date)
-            if result:
+            with metrics.observe(metrics.AVIARY_SECONDS, aviary_id):
+                result = await use_case.execute_async(aviary_id, date, self.executor)
+            if result and result.persisted:
                 logger.info(f"Aviary {aviary_id} ({config.name}) processed: {len(result.counts)} counts")
                 return True
+            if result:
+                # Collected: the journal flusher writes the queued read, so polling the device again gains nothing
+                logger.warning(f"Aviary {aviary_id} ({config.name}) read {len(result.counts)} counts, "
+                               f"database write queued in journal")
+                self.pending_writes.add(aviary_id)
+                return True
             logger.error(f"Aviary {aviary_id} ({config.name}) failed to process")
             return False
+        except WriteRejected as e:
+            logger.error(f"Aviary {aviary_id} ({config.name}) counts rejected by the database: {str(e)}")
+            return False
         except Exception as e:
             logger.error(f"Aviary {aviary_id} ({config.name}) error: {str(e)}\n{traceback.format_exc()}")
             return False
 
-    async def run_egg_counts_job(self):
+    async def _run_aviary(self, aviary_id: int, date_only: date, timings: Dict[int, Tuple[float, float]],
+                          delay: float = 0.0) -> bool:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        config = aviary_registry.configs[aviary_id]
+        if controller_health.is_open(config.ip):
+            # Fails without taking a limiter slot; the client would reject the read anyway
+            metrics.count(metrics.ORION_CIRCUIT_REJECTIONS, aviary_id)
+            logger.warning(f"Controller {config.ip} circuit open; skipping aviary {aviary_id} ({config.name})")
+            return False
+        async with self.limiter.for_ip(config.ip):
+            started = time.monotonic()
+            try:
+                return await self.process_aviary(aviary_id, date_only)
+            finally:
+                first_start = timings.get(aviary_id, (started, 0.0))[0]
+                timings[aviary_id] = (first_start, time.monotonic())
+
+    async def _run_batch(self, aviary_ids: List[int], date_only: date, deadline: float,
+                         timings: Dict[int, Tuple[float, float]],
+                         offsets: Optional[Dict[int, float]] = None) -> List[int]:
+        """Runs the aviaries concurrently, each after its offset if given, and returns the ones that failed or missed the deadline."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return list(aviary_ids)
+        offsets = offsets or {}
+        tasks = {
+            asyncio.ensure_future(self._run_aviary(avid, date_only, timings, offsets.get(avid, 0.0))): avid
+            for avid in aviary_ids
+        }
+        done, pending = await asyncio.wait(tasks, timeout=remaining)
+        for task in pending:
+            task.cancel()
+            logger.error(f"Aviary {tasks[task]} ({_aviary_name(tasks[task])}) missed the job deadline")
+
+        failed = []
+        for task, aviary_id in tasks.items():
+            if task in pending:
+                failed.append(aviary_id)
+            elif task.exception() is not None:
+                logger.error(f"Aviary {aviary_id} ({_aviary_name(aviary_id)}) error: {task.exception()}")
+                failed.append(aviary_id)
+            elif task.result() is not True:
+                failed.append(aviary_id)
+        return failed
+
+    async def _prefetch_lote_ids(self, aviaries: List[int], date_only: date, deadline: float):
+        # Bounded, so a slow or unreachable database cannot eat the deadline before any device is read;
+        # on timeout the lookups happen per aviary during its write, as without the prefetch
+        timeout = min(self.lote_prefetch_timeout_seconds, 0.1 * max(0.0, deadline - time.monotonic()))
+        try:
+            found = await asyncio.wait_for(asyncio.get_event_loop().run_in_executor(
+                self.executor, build_database_repository().prefetch_lote_ids, aviaries, date_only
+            ), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"lote_id prefetch did not finish within {timeout:.1f}s; continuing without it")
+            return
+        logger.info(f"Prefetched lote_id for {found}/{len(aviaries)} aviaries")
+
+    def _prioritize(self, aviary_ids: List[int]) -> List[int]:
+        """Last cycle's failures first, each group interleaved across controllers."""
+        return (self._interleave([avid for avid in aviary_ids if avid in self.last_failed])
+                + self._interleave([avid for avid in aviary_ids if avid not in self.last_failed]))
+
+    @staticmethod
+    def _interleave(aviary_ids: List[int]) -> List[int]:
+        # Round-robin over block IPs, so consecutive slots hit different controllers
+        by_controller: Dict[str, List[int]] = {}
+        for aviary_id in aviary_ids:
+            by_controller.setdefault(aviary_registry.configs[aviary_id].ip, []).append(aviary_id)
+        groups = list(by_controller.values())
+        return [group[i] for i in range(max(map(len, groups), default=0)) for group in groups if i < len(group)]
+
+    @staticmethod
+    def _stagger_offsets(aviary_ids: List[int], window_seconds: float) -> Dict[int, float]:
+        """Evenly spaced start offsets over the window, in the given order."""
+        if window_seconds <= 0 or not aviary_ids:
+            return {}
+        spacing = window_seconds / len(aviary_ids)
+        return {aviary_id: slot * spacing for slot, aviary_id in enumerate(aviary_ids)}
+
+    def _retry_delay(self, attempt: int, deadline: float) -> float:
+        # Full jitter, so retries against a struggling controller do not all land at the same moment
+        delay = random.uniform(0, min(self.retry_backoff_max_seconds, self.retry_backoff_base_seconds * 2 ** (attempt - 1)))
+        return max(0.0, min(delay, deadline - time.monotonic()))
+
+    def _log_block_summary(self, timings: Dict[int, Tuple[float, float]]):
+        blocks: Dict[str, List[Tuple[float, float]]] = {}
+        configs = aviary_registry.configs
+        for aviary_id, span in timings.items():
+            config = configs.get(aviary_id)
+            block = (config.block or config.ip) if config else "removed"
+            blocks.setdefault(block, []).append(span)
+        for block, spans in sorted(blocks.items()):
+            wall_time = max(end for _, end in spans) - min(start for start, _ in spans)
+            logger.info(f"Block {block}: {len(spans)} aviary runs in {wall_time:.2f}s wall time")
+
+    async def run_egg_counts_job(self, window_seconds: float = 0.0, wait_for_running: bool = False):
+        """One collection cycle; with `window_seconds`, aviary starts are spread over that window.
+
+        Cycles never overlap: while one runs, another is skipped, or with `wait_for_running` (the
+        day-end run) starts once it finished, so two cycles never race on the same counts or on `last_failed`.
+        """
+        if self._cycle_lock is None:
+            self._cycle_lock = asyncio.Lock()
+        if self._cycle_lock.locked():
+            if not wait_for_running:
+                logger.warning("Previous egg count cycle still running; skipping this one")
+                return
+            logger.info("Waiting for the running egg count cycle to finish")
+        requested_on = datetime.now(ZoneInfo('America/Argentina/Buenos_Aires')).date()
+        async with self._cycle_lock:
+            if datetime.now(ZoneInfo('America/Argentina/Buenos_Aires')).date() != requested_on:
+                logger.error(f"Egg count cycle for {requested_on} skipped: the date rolled over while it waited")
+                return
+            await self._run_cycle(window_seconds)
+
+    async def _run_cycle(self, window_seconds: float):
         argentina_tz = ZoneInfo('America/Argentina/Buenos_Aires')
         now_argentina = datetime.now(argentina_tz)
         date_only = now_argentina.date()
+        # Never run into the next day, where the counts would belong to the wrong date
+        until_midnight = (datetime.combine(date_only + timedelta(days=1), datetime.min.time(), tzinfo=argentina_tz)
+                          - now_argentina).total_seconds()
+        deadline = time.monotonic() + min(window_seconds + self.job_deadline_seconds, until_midnight)
         
         logger.info(f"Processing egg counts for {date_only} (Argentina time) at {now_argentina}")
         logger.debug(f"Full datetime in Argentina: {now_argentina.strftime('%Y-%m-%d %H:%M:%S %Z%z')}")
 
-        logger.info(f"Starting egg count job for {len(self.working_aviaries)} aviaries: {self.working_aviaries}")
-        
-        failed_aviaries = []
-        futures = [
-            asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                lambda avid=avid: (avid, self.process_aviary(avid, date_only))
-            )
-            for avid in self.working_aviaries
-        ]
-        results = await asyncio.gather(*futures, return_exceptions=True)
+        # The working set is read per cycle, so a registry reload applies from the next cycle on
+        aviaries = self._prioritize([avid for avid in aviary_registry.working_aviaries if avid in aviary_registry])
+        missing = [avid for avid in aviary_registry.working_aviaries if avid not in aviary_registry]
+        if missing:
+            logger.error(f"Missing configs for aviaries: {missing}")
+        logger.info(f"Starting egg count job for {len(aviaries)} aviaries: {aviaries}")
         
-        successes = 0
-        for aviary_id, result in results:
-            if result is True:
-                successes += 1
-            else:
-                failed_aviaries.append(aviary_id)
-                logger.warning(f"Aviary {aviary_id} ({AVIARY_CONFIGS[aviary_id].name}) added to retry list")
+        job_started = time.monotonic()
+        self.pending_writes = set()
+        skipped_before = count_snapshots.skipped_writes if count_snapshots else 0
+        await self._prefetch_lote_ids(aviaries, date_only, deadline)
+
+        offsets = self._stagger_offsets(aviaries, window_seconds)
+        if offsets:
+            logger.info(f"Staggering {len(aviaries)} aviaries over {window_seconds:.0f}s, "
+                        f"one start every {window_seconds / len(aviaries):.1f}s; "
+                        f"{len(self.last_failed & set(aviaries))} failed last cycle and go first")
+
+        timings: Dict[int, Tuple[float, float]] = {}
+        failed_aviaries = await self._run_batch(aviaries, date_only, deadline, timings, offsets)
+        for aviary_id in failed_aviaries:
+            logger.warning(f"Aviary {aviary_id} ({_aviary_name(aviary_id)}) added to retry list")
         
-        logger.info(f"Initial run completed: {successes}/{len(self.working_aviaries)} aviaries successful")
+        successes = len(aviaries) - len(failed_aviaries)
+        logger.info(f"Initial run completed: {successes}/{len(aviaries)} aviaries successful")
         
-        total_successes = successes
         for attempt in range(1, 3):
             if not failed_aviaries:
                 logger.info(f"No retries needed for attempt {attempt}; all aviaries processed")
                 break
+            if time.monotonic() >= deadline:
+                logger.error(f"Job deadline of {self.job_deadline_seconds}s reached; skipping remaining retries")
+                break
             
-            logger.info(f"Retry attempt {attempt} for {len(failed_aviaries)} failed aviaries: {failed_aviaries}")
-            retry_futures = [
-                asyncio.get_event_loop().run_in_executor(
-                    self.executor,
-                    lambda avid=avid: (avid, self.process_aviary(avid, date_only))
-                )
-                for avid in failed_aviaries
-            ]
-            retry_results = await asyncio.gather(*retry_futures, return_exceptions=True)
-            
-            retry_successes = 0
-            still_failed = []
-            for aviary_id, result in retry_results:
-                if result is True:
-                    retry_successes += 1
-                    total_successes += 1
-                else:
-                    still_failed.append(aviary_id)
-                    logger.error(f"Aviary {aviary_id} ({AVIARY_CONFIGS[aviary_id].name}) failed on retry attempt {attempt}")
+            delay = self._retry_delay(attempt, deadline)
+            logger.info(f"Retry attempt {attempt} for {len(failed_aviaries)} failed aviaries in {delay:.1f}s: {failed_aviaries}")
+            await asyncio.sleep(delay)
+            for aviary_id in failed_aviaries:
+                metrics.count(metrics.AVIARY_RETRIES, aviary_id)
+            still_failed = await self._run_batch(failed_aviaries, date_only, deadline, timings)
+            for aviary_id in still_failed:
+                logger.error(f"Aviary {aviary_id} ({_aviary_name(aviary_id)}) failed on retry attempt {attempt}")
             
+            retry_successes = len(failed_aviaries) - len(still_failed)
             logger.info(f"Retry attempt {attempt} completed: {retry_successes}/{len(failed_aviaries)} aviaries successful")
             failed_aviaries = still_failed
         
-        logger.info(f"Job summary: {total_successes}/{len(self.working_aviaries)} aviaries successful")
+        total_successes = len(aviaries) - len(failed_aviaries)
+        self.last_failed = set(failed_aviaries)
+        self._log_block_summary(timings)
+        logger.info(f"Orion connection pool: {orion_pool.stats()}")
+        logger.info(f"Controller health: {controller_health.stats()}")
+        logger.info(f"Request coalescing: {egg_count_flights.stats()}")
+        logger.info(f"lote_id cache: {lote_cache.stats()}")
+        if write_journal:
+            logger.info(f"Write journal: {write_journal.pending_count()} writes pending, "
+                        f"{write_journal.failed_count()} failed")
+        if count_snapshots:
+            logger.info(f"Change detection skipped {count_snapshots.skipped_writes - skipped_before} unchanged fila writes")
+        logger.info(f"Job summary: {total_successes}/{len(aviaries)} aviaries collected in {time.monotonic() - job_started:.2f}s")
+        if self.pending_writes:
+            logger.warning(f"Collected with database write pending in the journal: {sorted(self.pending_writes)}")
         if failed_aviaries:
             logger.error(f"Persistent failures after retries: {failed_aviaries}")
 
     def start(self):
+        if self.scheduler.running:
+            self.scheduler.resume()
+            metrics.SCHEDULER_ACTIVE.set(1)
+            logger.info("Scheduler resumed")
+            return
         argentina_tz = ZoneInfo('America/Argentina/Buenos_Aires')
         utc_tz = ZoneInfo('UTC')
         now_utc = datetime.now(utc_tz)
@@ -121,22 +290,76 @@ class EggCountScheduler:
         
         logger.info(f"UTC Time: {now_utc.strftime('%Y-%m-%d %H:%M:%S %Z%z')}")
         logger.info(f"Argentina Time: {now_argentina.strftime('%Y-%m-%d %H:%M:%S %Z%z')}")
-        logger.info(f"Scheduled jobs will run at these Argentina times: 3:59, 7:59, 11:59, 15:59, 19:59, 23:59")
 
+        if self.mode == "staggered":
+            self._schedule_staggered()
+        else:
+            if self.mode != "burst":
+                logger.error(f"Unknown scheduler mode {self.mode!r}; using burst")
+            logger.info(f"Scheduled jobs will run at these Argentina times: 3:59, 7:59, 11:59, 15:59, 19:59, 23:59")
+            self.scheduler.add_job(
+                self.run_egg_counts_job,
+                'cron',
+                hour='3,7,11,15,19,23',
+                minute=59,
+                second=0,
+                timezone=ZoneInfo('America/Argentina/Buenos_Aires'),
+                id='egg_counts_job',
+                replace_existing=True
+            )
+            logger.info("Cron schedule: 3:59, 7:59, 11:59, 15:59, 19:59, 23:59 Argentina time")
+        self.scheduler.start()
+        metrics.SCHEDULER_ACTIVE.set(1)
+
+    def _schedule_staggered(self):
+        # The staggered cycle (window plus retry deadline) ends at HH:59:00, where the burst cycle starts;
+        # __init__ rejects deadlines that leave no room for it
+        max_window = 59 * 60 - self.job_deadline_seconds
+        window = min(self.stagger_window_seconds, max_window)
+        if window < self.stagger_window_seconds:
+            logger.warning(f"SCHEDULER_STAGGER_WINDOW_SECONDS capped at {window:.0f}s")
+        minute, second = divmod(int(59 * 60 - window - self.job_deadline_seconds), 60)
+        logger.info(f"Staggered cycles start at {minute:02d}:{second:02d} past hours 3, 7, 11, 15, 19, 23 "
+                    f"and spread aviaries over {window:.0f}s (Argentina time)")
         self.scheduler.add_job(
             self.run_egg_counts_job,
             'cron',
             hour='3,7,11,15,19,23',
-            minute=59,
-            second=0,
+            minute=minute,
+            second=second,
             timezone=ZoneInfo('America/Argentina/Buenos_Aires'),
             id='egg_counts_job',
+            kwargs={"window_seconds": window},
             replace_existing=True
         )
-        self.scheduler.start()
-        logger.info("Cron schedule: 3:59, 7:59, 11:59, 15:59, 19:59, 23:59 Argentina time")
+
+        # A last burst run just before midnight captures the final daily totals
+        lead = min(max(1, int(self.day_end_run_lead_seconds)), 59 * 60)
+        day_end_minute, day_end_second = divmod(3600 - lead, 60)
+        logger.info(f"Day-end run at 23:{day_end_minute:02d}:{day_end_second:02d} Argentina time")
+        self.scheduler.add_job(
+            self.run_egg_counts_job,
+            'cron',
+            hour=23,
+            minute=day_end_minute,
+            second=day_end_second,
+            timezone=ZoneInfo('America/Argentina/Buenos_Aires'),
+            id='egg_counts_day_end_job',
+            kwargs={"wait_for_running": True},
+            replace_existing=True
+        )
+
+    def pause(self):
+        """Stops firing scheduled cycles (a cycle already running finishes); `start()` resumes them."""
+        if self.scheduler.running:
+            self.scheduler.pause()
+            metrics.SCHEDULER_ACTIVE.set(0)
+            logger.info("Scheduler paused")
 
     def shutdown(self):
-        self.scheduler.shutdown()
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        metrics.SCHEDULER_ACTIVE.set(0)
+        self.jobs.cancel_all()
         self.executor.shutdown(wait=True)
         logger.info("Scheduler stopped")
\ No newline at end of file
@@ -0,0 +1,41 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from src.domain.entities.egg_count import EggCount
+from src.domain.entities.egg_count_job import JOB_QUEUED, JOB_SUCCEEDED, EggCountJob
+from src.infrastructure.state.job_store import SqliteEggCountJobStore
+
+DAY = date(2025, 6, 9)
+STARTED = datetime(2025, 6, 9, 10, 0, tzinfo=timezone(timedelta(hours=-3)))
+
+
+def _job(job_id, minutes=0, status=JOB_QUEUED, **kwargs):
+    return EggCountJob(id=job_id, aviary_id=15, count_date=DAY, status=status,
+                       created_at=STARTED + timedelta(minutes=minutes), **kwargs)
+
+
+def test_a_job_saved_by_one_worker_is_read_by_another(tmp_path):
+    path = os.path.join(str(tmp_path), "egg_count_jobs.sqlite3")
+    accepting, other = SqliteEggCountJobStore(path), SqliteEggCountJobStore(path)
+    job = _job("a")
+    accepting.save(job)
+    assert other.get("a").status == JOB_QUEUED
+
+    job.status = JOB_SUCCEEDED
+    job.finished_at = STARTED + timedelta(seconds=2)
+    job.result = EggCount(15, DAY, [10, 20], {0: 1, 1: 2}, persisted=False)
+    job.error = "Egg counts read; database write queued"
+    accepting.save(job)
+    stored = other.get("a")
+    assert (stored.status, stored.finished_at, stored.error) == (JOB_SUCCEEDED, job.finished_at, job.error)
+    assert stored.result == job.result
+    assert other.get("missing") is None
+
+
+def test_prune_keeps_the_newest_finished_and_all_unfinished_jobs(tmp_path):
+    store = SqliteEggCountJobStore(os.path.join(str(tmp_path), "egg_count_jobs.sqlite3"))
+    for minutes in range(3):
+        store.save(_job(f"done{minutes}", minutes, status=JOB_SUCCEEDED,
+                        finished_at=STARTED + timedelta(minutes=minutes)))
+    store.save(_job("queued"))
+    store.prune(max_finished=1)
+    assert [job_id for job_id in ("done0", "done1", "done2", "queued") if store.get(job_id)] == ["done2", "queued"]
@@ -0,0 +1,96 @@
+import json
+import os
+import pytest
+from src.infrastructure.orion.decoding import FrameError, decode_frame, xor_bytes
+from src.infrastructure.orion.protocol import FrameBuffer
+
+CAPTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "orion_frames.json")
+with open(CAPTURES_PATH, encoding="utf-8") as f:
+    CAPTURES = json.load(f)["frames"]
+
+HEADER = b"#15DEV  0467F31"  # 15 bytes, as the original parser sliced them off
+COUNTS = [0, 1, 255, 4096, 65535]
+
+
+def _frame(counts, trailer=None, checksum=None):
+    # Layout the original client parsed: 15-byte header, 4 hex digits per row, then "*XX"
+    body = HEADER + "".join(f"{count:04X}" for count in counts).encode("ascii")
+    checksum = xor_bytes(body) if checksum is None else checksum
+    return body + (trailer or f"*{checksum:02X}".encode("ascii"))
+
+
+def test_decode_frame_reads_the_payload_between_header_and_trailer():
+    assert decode_frame(_frame(COUNTS), len(COUNTS), verify_checksum=False).tolist() == COUNTS
+
+
+def test_decode_frame_accepts_surrounding_line_breaks():
+    assert decode_frame(b"\r\n" + _frame(COUNTS) + b"\r", len(COUNTS), verify_checksum=False).tolist() == COUNTS
+
+
+def test_decode_frame_rejects_checksum_before_star():
+    body = _frame(COUNTS)[:-3]
+    with pytest.raises(FrameError):
+        decode_frame(body + f"{xor_bytes(body):02X}*".encode("ascii"), len(COUNTS), verify_checksum=False)
+
+
+def test_decode_frame_rejects_wrong_payload_length():
+    with pytest.raises(FrameError):
+        decode_frame(_frame(COUNTS), len(COUNTS) + 1, verify_checksum=False)
+
+
+def test_decode_frame_rejects_non_hex_payload():
+    frame = bytearray(_frame(COUNTS))
+    frame[len(HEADER)] = ord("G")
+    with pytest.raises(FrameError):
+        decode_frame(bytes(frame), len(COUNTS), verify_checksum=False)
+
+
+def test_checksum_is_only_checked_when_enabled():
+    frame = _frame(COUNTS, checksum=0x00 if xor_bytes(_frame(COUNTS)[:-3]) else 0x01)
+    assert decode_frame(frame, len(COUNTS), verify_checksum=False).tolist() == COUNTS
+    with pytest.raises(FrameError):
+        decode_frame(frame, len(COUNTS), verify_checksum=True)
+    assert decode_frame(_frame(COUNTS), len(COUNTS), verify_checksum=True).tolist() == COUNTS
+
+
+def test_frame_buffer_reassembles_a_reply_fed_byte_by_byte():
+    reply = _frame(COUNTS) + b"\r"
+    buffer = FrameBuffer()
+    for index in range(len(reply) - 1):
+        buffer.feed(reply[index:index + 1])
+        assert buffer.next_frame(len(reply)) is None
+    buffer.feed(reply[-1:])
+    assert buffer.next_frame(len(reply)) == _frame(COUNTS)
+    assert len(buffer) == 0
+
+
+def test_frame_buffer_splits_replies_received_in_one_chunk():
+    first, second = _frame(COUNTS), _frame(list(reversed(COUNTS)))
+    buffer = FrameBuffer()
+    buffer.feed(first + b"\r\n" + second + b"\r")
+    assert buffer.next_frame(len(first) + 1) == first
+    assert buffer.next_frame(len(second) + 1) == second
+    assert buffer.next_frame(len(second) + 1) is None
+
+
+def test_frame_buffer_returns_a_full_size_reply_without_terminator():
+    # Some controllers send the terminator in a later segment
+    frame = _frame(COUNTS)
+    buffer = FrameBuffer()
+    buffer.feed(frame)
+    assert buffer.next_frame(len(frame)) == frame
+    buffer.feed(b"\r")
+    assert buffer.next_frame(len(frame)) is None
+
+
+@pytest.mark.parametrize("capture", CAPTURES, ids=[capture["name"] for capture in CAPTURES])
+def test_captured_reply_decodes_to_the_displayed_counts(capture):
+    buffer = FrameBuffer()
+    frame = None
+    for chunk in capture["chunks"]:
+        buffer.feed(bytes.fromhex(chunk))
+        frame = buffer.next_frame(capture["response_size"]) or frame
+    assert frame is not None
+    assert decode_frame(frame, capture["num_rows"], verify_checksum=False).tolist() == capture["counts"]
+    # For "controller" captures this confirms the checksum coverage before ORION_VERIFY_CHECKSUM may be turned on
+    assert decode_frame(frame, capture["num_rows"], verify_checksum=True).tolist() == capture["counts"]
@@ -0,0 +1,121 @@
+import asyncio
+import os
+from datetime import date
+import pytest
+from src.application.services.count_writer import CountWriter
+from src.application.services.journal_flusher import JournalFlusher
+from src.application.use_cases.process_egg_counts import ProcessEggCountsUseCase
+from src.domain.interfaces.database_repository import DatabaseRepository, WriteRejected
+from src.infrastructure.state.write_journal import SqliteWriteJournal
+
+DAY = date(2025, 6, 9)
+FILA_MAPPING = {0: 1, 1: 2, 2: 3}
+
+
+class RecordingRepository(DatabaseRepository):
+    """Records upserts; `outcome` is what the next upsert returns, or an exception it raises."""
+
+    def __init__(self, outcome=True):
+        self.outcome = outcome
+        self.writes = []
+
+    def upsert_egg_counts(self, aviary_id, count_date, counts, fila_mapping):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        if self.outcome:
+            self.writes.append((aviary_id, count_date, list(counts)))
+        return self.outcome
+
+
+@pytest.fixture
+def state_dir(tmp_path):
+    return str(tmp_path)
+
+
+def _journal(state_dir, **kwargs):
+    # No backoff, so appended and rescheduled entries are due right away
+    kwargs.setdefault("max_attempts", 3)
+    return SqliteWriteJournal(os.path.join(state_dir, "write_journal.sqlite3"),
+                              backoff_base_seconds=0, backoff_max_seconds=0, **kwargs)
+
+
+def _use_case(journal, repo):
+    return ProcessEggCountsUseCase(orion_repo=None, db_repo=repo, fila_mapping=FILA_MAPPING, journal=journal)
+
+
+def _flush(journal, repo):
+    return asyncio.run(JournalFlusher(journal, CountWriter(repo), interval_seconds=60, batch_size=10).flush_once())
+
+
+def test_successful_write_leaves_nothing_queued(state_dir):
+    journal, repo = _journal(state_dir), RecordingRepository()
+    assert _use_case(journal, repo).persist_counts(15, DAY, [10, 20, 30]) is True
+    assert repo.writes == [(15, DAY, [10, 20, 30])]
+    assert journal.pending_count() == 0
+
+
+def test_transient_failure_keeps_the_read_queued_for_retry(state_dir):
+    journal, repo = _journal(state_dir, claim_seconds=0), RecordingRepository(outcome=False)
+    assert _use_case(journal, repo).persist_counts(15, DAY, [10, 20, 30]) is False
+    (entry,) = journal.due(10)
+    assert (entry.aviary_id, entry.date, entry.counts, entry.attempts) == (15, DAY, [10, 20, 30], 1)
+
+    repo.outcome = True
+    assert _flush(journal, repo) == 1
+    assert repo.writes == [(15, DAY, [10, 20, 30])]
+    assert journal.pending_count() == 0
+
+
+def test_transient_failures_move_to_failed_writes_after_max_attempts(state_dir):
+    journal, repo = _journal(state_dir, claim_seconds=0), RecordingRepository(outcome=False)
+    _use_case(journal, repo).persist_counts(15, DAY, [10, 20, 30])
+    _flush(journal, repo)
+    assert journal.pending_count() == 1
+    _flush(journal, repo)
+    assert (journal.pending_count(), journal.failed_count()) == (0, 1)
+
+
+def test_rejected_write_moves_to_failed_writes_at_once(state_dir):
+    journal, repo = _journal(state_dir), RecordingRepository(outcome=WriteRejected("tipo 2"))
+    with pytest.raises(WriteRejected):
+        _use_case(journal, repo).persist_counts(15, DAY, [10, 20, 30])
+    assert (journal.pending_count(), journal.failed_count()) == (0, 1)
+
+
+def test_claimed_entries_are_not_handed_out_twice(state_dir):
+    first, second = _journal(state_dir), _journal(state_dir)
+    for aviary_id in range(5):
+        first.append(aviary_id, DAY, [aviary_id], FILA_MAPPING)
+    claimed = [entry.id for entry in first.due(3)]
+    rest = [entry.id for entry in second.due(10)]
+    assert len(claimed) == 3 and len(rest) == 2
+    assert not set(claimed) & set(rest)
+    assert first.due(10) == [] and second.due(10) == []
+
+
+def test_lapsed_claim_is_handed_out_again(state_dir):
+    journal = _journal(state_dir, claim_seconds=0)
+    entry_id = journal.append(15, DAY, [1], FILA_MAPPING)
+    assert [entry.id for entry in journal.due(10)] == [entry_id]
+    assert [entry.id for entry in journal.due(10)] == [entry_id]
+
+
+def test_older_read_does_not_replace_a_newer_queued_one(state_dir):
+    journal = _journal(state_dir)
+    newer = journal.append(15, DAY, [20, 20, 20], FILA_MAPPING, read_at=200.0)
+    assert journal.append(15, DAY, [10, 10, 10], FILA_MAPPING, read_at=100.0) == newer
+    (entry,) = journal.due(10)
+    assert (entry.id, entry.counts) == (newer, [20, 20, 20])
+
+
+def test_newer_write_drops_a_claimed_older_read(state_dir):
+    journal, repo = _journal(state_dir), RecordingRepository(outcome=False)
+    _use_case(journal, repo).persist_counts(15, DAY, [10, 20, 30])
+    (older,) = journal.due(10)
+
+    # A newer read is written while the claimed older entry is still waiting for the flusher
+    repo.outcome = True
+    _use_case(journal, repo).persist_counts(15, DAY, [11, 21, 31])
+    assert not journal.is_pending(older.id)
+    assert _flush(journal, repo) == 0
+    assert repo.writes == [(15, DAY, [11, 21, 31])]